@@ -0,0 +1,185 @@
+# backend/cache.py
+#
+# Cache לתוצאות של פונקציות קריאה (areas, כיסאות של אורח וכו').
+#
+# המפתח = שם הפונקציה + הארגומנטים (בלי ה-Session) + "דור" של כל טבלה שהפונקציה קוראת.
+# כל commit שנגע בשורות users/seats מעלה את הדור של הטבלה, ולכן ערכים ישנים
+# פשוט מפסיקים להימצא (ובסוף נזרקים מה-LRU) – אין צורך למחוק אותם ידנית.
+#
+# הדורות נשמרים בזיכרון משותף (multiprocessing.Array) שנוצר בזמן import.
+# תחת gunicorn עם preload_app (gunicorn_conf.py) המודול נטען בתהליך הראשי לפני ה-fork,
+# כך שכל ה-workers רואים את אותם מונים – commit ב-worker אחד מבטל את ה-cache בכולם.
+# בין מכונות שונות אין שיתוף, ולכן יש גם CACHE_TTL שמגביל כמה זמן ערך יכול להיות ישן.
+
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+CACHE_TTL     = float(os.getenv("CACHE_TTL", "60"))      # שניות
+CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", "512"))   # ערכים לכל פונקציה
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1") != "0"
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  דורות לכל טבלה (משותף בין תהליכים)
+# ─────────────────────────────────────────────────────────────────────────────
+_TABLES = ("users", "seats")
+_TABLE_INDEX = {name: i for i, name in enumerate(_TABLES)}
+_generations = multiprocessing.Array("q", len(_TABLES))
+
+
+def generation(table: str) -> int:
+    return _generations[_TABLE_INDEX[table]]
+
+
+def bump(*tables: str) -> None:
+    with _generations.get_lock():
+        for table in tables:
+            if table in _TABLE_INDEX:
+                _generations[_TABLE_INDEX[table]] += 1
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  LRU + סטטיסטיקה (לכל תהליך)
+# ─────────────────────────────────────────────────────────────────────────────
+class _LRU:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.data: "OrderedDict[Tuple, Tuple[float, object]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple):
+        with self.lock:
+            item = self.data.get(key)
+            if item is not None and time.monotonic() - item[0] < CACHE_TTL:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return True, item[1]
+            if item is not None:
+                del self.data[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Tuple, value) -> None:
+        with self.lock:
+            self.data[key] = (time.monotonic(), value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.data.clear()
+
+
+_registry: Dict[str, _LRU] = {}
+
+
+def cached(*tables: str, maxsize: int = CACHE_MAXSIZE) -> Callable:
+    """
+    דקורטור לפונקציית קריאה שהארגומנט הראשון שלה הוא Session.
+    tables – הטבלאות שהתוצאה תלויה בהן (למשל "users", "seats").
+
+    ⚠️  הערך המוחזר משותף בין קריאות – להחזיר רק נתונים פשוטים (str/dict/list),
+        לעולם לא אובייקטי ORM, ולא לשנות אותו אצל הקורא.
+    """
+    for table in tables:
+        if table not in _TABLE_INDEX:
+            raise ValueError(f"unknown cache table: {table}")
+
+    def decorator(fn: Callable) -> Callable:
+        lru = _LRU(maxsize)
+        _registry[fn.__qualname__] = lru
+
+        @functools.wraps(fn)
+        def wrapper(db: Session, *args, **kwargs):
+            if not CACHE_ENABLED:
+                return fn(db, *args, **kwargs)
+            # הדורות נקראים לפני השאילתה: אם commit יקרה באמצע, הערך יישמר תחת הדור הישן
+            gens = tuple(generation(t) for t in tables)
+            key = (gens, args, tuple(sorted(kwargs.items())))
+            found, value = lru.get(key)
+            if found:
+                return value
+            value = fn(db, *args, **kwargs)
+            lru.put(key, value)
+            return value
+
+        wrapper.cache = lru
+        return wrapper
+
+    return decorator
+
+
+def stats() -> dict:
+    """מונים של התהליך הנוכחי + הדורות המשותפים."""
+    return {
+        "pid": os.getpid(),
+        "generations": {t: generation(t) for t in _TABLES},
+        "functions": {
+            name: {"hits": lru.hits, "misses": lru.misses, "size": len(lru.data)}
+            for name, lru in _registry.items()
+        },
+    }
+
+
+def clear() -> None:
+    for lru in _registry.values():
+        lru.clear()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  ביטול אוטומטי דרך אירועי SQLAlchemy
+#  after_flush    – שינויים ב-ORM (add / setattr / delete)
+#  do_orm_execute – פקודות bulk (query.update/delete, insert(Seat)) שלא עוברות flush;
+#                   רק אם נגעו בשורה אחת לפחות (rowcount), אחרת אין מה לבטל
+#  after_commit   – רק אז הדור עולה; rollback מוחק את מה שנאסף
+# ─────────────────────────────────────────────────────────────────────────────
+_PENDING_KEY = "cache_pending_tables"
+
+
+def _mark(session: Session, table_name: str) -> None:
+    if table_name in _TABLE_INDEX:
+        session.info.setdefault(_PENDING_KEY, set()).add(table_name)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            _mark(session, table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _do_orm_execute(state):
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return None
+    table = getattr(state.statement, "table", None)
+    if table is None or table.name not in _TABLE_INDEX:
+        return None
+    result = state.invoke_statement()
+    # rowcount == -1 כשהדרייבר לא יודע – אז מסמנים ליתר ביטחון
+    if getattr(result, "rowcount", -1) != 0:
+        _mark(state.session, table.name)
+    return result
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    tables = session.info.pop(_PENDING_KEY, None)
+    if tables:
+        bump(*tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
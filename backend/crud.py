@@ -1,8 +1,14 @@
+import secrets
+import time
+from datetime import timedelta
 from typing import List
 
+import sqlalchemy as sa
 from sqlalchemy import func
 from sqlalchemy.orm import Session
-from backend.db import User, Seat
+from backend.db import User, Seat, Photo
+from backend.cache import cached
+import backend.layout as layout
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  USERS
@@ -10,6 +16,31 @@ from backend.db import User, Seat
 def get_user_by_phone(db: Session, phone: str) -> User | None:
     return db.query(User).filter(User.phone == phone).first()
 
+def find_guest(db: Session, phone: str) -> User | None:
+    """אורח לפי טלפון ראשי או משני."""
+    return db.query(User).filter(
+        sa.or_(User.phone == phone, User.Phone2 == phone)
+    ).first()
+
+def get_or_create_guest(db: Session, name: str, phone: str) -> User:
+    """
+    מחפש אורח לפי טלפון ראשי או משני; אם אין – יוצר "אורח לא רשום".
+    """
+    user = find_guest(db, phone)
+    if not user:
+        user = create_user(db, {
+            "name":      name,
+            "phone":     phone,
+            "user_type": "אורח לא רשום",
+        })
+    return user
+
+@cached("users")
+def phone_exists(db: Session, phone: str) -> bool:
+    return db.query(User.id).filter(
+        sa.or_(User.phone == phone, User.Phone2 == phone)
+    ).first() is not None
+
 def create_user(db: Session, payload: dict) -> User:
     """
     payload example: { "name": "...", "phone": "...", "user_type": "...", ... }
@@ -42,41 +73,53 @@ def all_users(db: Session) -> List[User]:
 def all_seats(db: Session) -> List[Seat]:
     return db.query(Seat).all()
 
-def assign_seats(db: Session, seat_ids: List[int], user_id: int) -> None:
+@cached("seats")
+def seats_of_user(db: Session, user_id: int) -> List[dict]:
     """
-    משחרר קודם כל כיסאות שייכים למשתמש, ואז מסמן free⇒taken על ה‐seat_ids החדשים.
-    מוודא תחילה שהכיסאות החדשים לא נתפסו כבר על ידי מישהו אחר כדי למנוע התנגשויות.
-
-    הבדיקה וההשמה מוגנות ב-SELECT ... FOR UPDATE על שורות ה-seats המבוקשות:
-    זה נועל אותן עד ה-commit, כך שסבב מתחרה על אותם כיסאות ייחסם ברמת ה-DB
-    במקום לעבור את הבדיקה במקביל (race בין check ל-update).
+    הכיסאות של אורח כ-dict (לא אובייקטי ORM, כדי שאפשר יהיה לשמור ב-cache).
     """
-    if seat_ids:
-        locked_seats = (
-            db.query(Seat)
-            .filter(Seat.id.in_(seat_ids))
-            .with_for_update()
-            .all()
-        )
+    seats = db.query(Seat).filter(Seat.owner_id == user_id).all()
+    return [
+        {"id": s.id, "row": s.row, "col": s.col, "area": s.area,
+         "status": s.status, "owner_id": s.owner_id}
+        for s in seats
+    ]
 
-        taken_by_others = next(
-            (s for s in locked_seats if s.owner_id is not None and s.owner_id != user_id),
-            None,
-        )
+def assign_seats(db: Session, seat_ids: List[int], user_id: int, hold_id: str | None = None) -> None:
+    """
+    משחרר קודם כל כיסאות שייכים למשתמש, ואז מסמן free⇒taken על ה‐seat_ids החדשים.
 
-        if taken_by_others:
-            db.rollback()
-            raise ValueError("אופס! אחד או יותר מהמקומות שניסית לתפוס נתפסו כרגע על ידי מארחת אחרת.")
+    ההשמה היא UPDATE מותנה ולא SELECT ... FOR UPDATE: רק כיסאות שפנויים (או כבר של המשתמש)
+    ושאינם מוחזקים ע"י אדמין אחר מתעדכנים. עם hold_id – רק כיסאות שההחזקה הפעילה עליהם
+    היא של hold_id. אם מספר השורות שעודכנו קטן מהמבוקש – מישהו הקדים אותנו, ו-rollback.
+    """
+    seat_ids = list(set(seat_ids))
 
     # 1) שחרור כיסאות קיימים ל‐user_id
     db.query(Seat).filter(Seat.owner_id == user_id).update(
         {"status": "free", "owner_id": None}, synchronize_session=False
     )
 
-    # 2) סמן ישיבה חדשה כ‐taken + עדכן owner_id
+    # 2) סמן ישיבה חדשה כ‐taken + עדכן owner_id (ומשחרר את ההחזקה)
     if seat_ids:
-        db.query(Seat).filter(Seat.id.in_(seat_ids)).update(
-            {"status": "taken", "owner_id": user_id}, synchronize_session=False
+        hold_cond = (
+            sa.and_(Seat.held_by == hold_id, _hold_active())
+            if hold_id else _not_held_by_others(None)
+        )
+        claimed = db.query(Seat).filter(
+            Seat.id.in_(seat_ids), _claimable_by(user_id), hold_cond
+        ).update(
+            {"status": "taken", "owner_id": user_id, "held_by": None, "hold_expires_at": None},
+            synchronize_session=False,
+        )
+        if claimed != len(seat_ids):
+            db.rollback()
+            raise ValueError(SEATS_CONFLICT_MSG)
+
+    # שאריות של ההחזקה (אם נבחרו פחות כיסאות ממה שהוחזק)
+    if hold_id:
+        db.query(Seat).filter(Seat.held_by == hold_id).update(
+            {"held_by": None, "hold_expires_at": None}, synchronize_session=False
         )
 
     db.commit()
@@ -84,26 +127,146 @@ def assign_seats(db: Session, seat_ids: List[int], user_id: int) -> None:
 
 def create_new_table(db: Session, area: str, capacity: int = 12) -> int:
     """
-    מוצא את מספר השולחן (col) המקסימלי באזור הנתון,
-    ומייצר שולחן חדש עם כמות המקומות המבוקשת (ברירת מחדל 12).
+    מייצר שולחן חדש באזור עם כמות המקומות המבוקשת (ברירת מחדל 12).
+    מספר השולחן (col) נקבע תחת נעילת אזור, והכיסאות נוצרים ב-INSERT אחד.
+    """
+    try:
+        new_col = layout.add_tables(db, area, 1, capacity)[0]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return new_col
+
+def delete_table(db: Session, area: str, col: int) -> List[int]:
+    """
+    מוחק את כל הכיסאות ששייכים לשולחן (col) באזור (area) המסוים.
+    אורחים שישבו שם חוזרים ל"רזרבה" (ללא כיסאות) – ה-id שלהם מוחזר לדיווח.
     """
-    # חיפוש מספר השולחן הכי גבוה באזור
-    max_col = db.query(func.max(Seat.col)).filter(Seat.area == area).scalar() or 0
-    new_col = max_col + 1
+    return layout.delete_table(db, area, col)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  SEAT HOLDS
+#  אדמין שבוחר שולחן מקבל "החזקה" קצרה על הכיסאות (held_by + hold_expires_at),
+#  בלי נעילת שורות. אדמינים אחרים רואים מיד שהכיסאות מוחזקים, והשיבוץ הסופי
+#  הוא UPDATE מותנה (compare-and-set): מצליח רק אם ההחזקה עדיין של אותו hold_id.
+#  החזקה שפג תוקפה פשוט לא נחשבת – הניקוי (sweep_expired_holds) הוא רק סדר בטבלה,
+#  ולכן הוא רץ בטרנזקציה נפרדת ולכל היותר פעם ב-HOLD_SWEEP_INTERVAL, לא בתוך כל החזקה.
+# ─────────────────────────────────────────────────────────────────────────────
+HOLD_TTL = timedelta(seconds=120)
+HOLD_SWEEP_INTERVAL = 60    # שניות, לכל worker
+
+SEATS_CONFLICT_MSG = "אופס! אחד או יותר מהמקומות שניסית לתפוס נתפסו כרגע על ידי מארחת אחרת."
+
+
+def _hold_active():
+    return Seat.hold_expires_at > func.now()
 
-    new_seats = []
-    for row in range(1, capacity + 1):
-        new_seat = Seat(row=row, col=new_col, area=area, status="free", owner_id=None)
-        new_seats.append(new_seat)
 
-    db.add_all(new_seats)
+def _not_held_by_others(hold_id: str | None):
+    """הכיסא פנוי מהחזקות – או שההחזקה פגה, או שהיא של hold_id עצמו."""
+    conds = [Seat.hold_expires_at == None, Seat.hold_expires_at <= func.now()]
+    if hold_id:
+        conds.append(Seat.held_by == hold_id)
+    return sa.or_(*conds)
+
+
+def _claimable_by(user_id: int):
+    return sa.or_(Seat.owner_id == None, Seat.owner_id == user_id)
+
+
+_last_hold_sweep = 0.0
+
+
+def sweep_expired_holds(db: Session, force: bool = False) -> int:
+    """
+    מנקה החזקות שפג תוקפן (סריקת טווח על ix_seats_hold_expires_at) ועושה commit משלו,
+    כך שנעילות השורות של הניקוי לא מחזיקות את טרנזקציית ההחזקה/השיבוץ.
+    מוגבל לפעם ב-HOLD_SWEEP_INTERVAL. מחזיר כמה כיסאות שוחררו.
+    """
+    global _last_hold_sweep
+    now = time.monotonic()
+    if not force and now - _last_hold_sweep < HOLD_SWEEP_INTERVAL:
+        return 0
+    _last_hold_sweep = now
+
+    try:
+        swept = db.query(Seat).filter(Seat.hold_expires_at <= func.now()).update(
+            {"held_by": None, "hold_expires_at": None}, synchronize_session=False
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return swept
+
+
+def place_hold(db: Session, seat_ids: List[int], user_id: int, hold_id: str | None = None) -> str:
+    """
+    מחזיק את seat_ids עבור user_id למשך HOLD_TTL. מחזיר hold_id.
+    אם hold_id קיים (האדמין החליף שולחן) – ההחזקה הקודמת שלו משתחררת ומתחדשת על הכיסאות החדשים.
+    """
+    if not seat_ids:
+        raise ValueError("לא נבחרו כיסאות להחזקה.")
+    hold_id = hold_id or secrets.token_hex(8)
+    seat_ids = list(set(seat_ids))
+    try:
+        db.query(Seat).filter(Seat.held_by == hold_id, Seat.id.notin_(seat_ids)).update(
+            {"held_by": None, "hold_expires_at": None}, synchronize_session=False
+        )
+        held = db.query(Seat).filter(
+            Seat.id.in_(seat_ids),
+            _claimable_by(user_id),
+            _not_held_by_others(hold_id),
+        ).update(
+            {"held_by": hold_id, "hold_expires_at": func.now() + HOLD_TTL},
+            synchronize_session=False,
+        )
+        if held != len(seat_ids):
+            raise ValueError(SEATS_CONFLICT_MSG)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return hold_id
+
+
+def release_hold(db: Session, hold_id: str) -> None:
+    db.query(Seat).filter(Seat.held_by == hold_id).update(
+        {"held_by": None, "hold_expires_at": None}, synchronize_session=False
+    )
     db.commit()
-    return new_col
 
-def delete_table(db: Session, area: str, col: int) -> None:
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  PHOTOS
+# ─────────────────────────────────────────────────────────────────────────────
+def create_photo(db: Session, token: str, uploader: str | None) -> Photo:
     """
-    מוחק את כל הכיסאות ששייכים לשולחן (col) באזור (area) המסוים.
-    אם ישבו שם אנשים, הכיסאות שלהם פשוט יימחקו, והם יחזרו אוטומטית ל"רזרבה" (ללא כיסאות).
+    אידמפוטנטי לפי token: PATCH שנכשל אחרי ה-INSERT (למשל בהעברת הקובץ) ונשלח שוב
+    לא נופל על האילוץ הייחודי.
+    """
+    photo = db.query(Photo).filter(Photo.token == token).first()
+    if photo:
+        return photo
+    photo = Photo(token=token, uploader=uploader, status="processing")
+    db.add(photo)
+    db.commit()
+    return photo
+
+def set_photo_status(db: Session, token: str, status: str) -> None:
+    db.query(Photo).filter(Photo.token == token).update(
+        {"status": status}, synchronize_session=False
+    )
+    db.commit()
+
+def photo_feed(db: Session, before_id: int | None, limit: int) -> List[Photo]:
+    """
+    עמוד בגלריה – החדשות ראשונות. דפדוף לפי id (keyset) ולא OFFSET,
+    כך שתמונות שנוספות בזמן הגלילה לא מזיזות את העמודים.
     """
-    db.query(Seat).filter(Seat.area == area, Seat.col == col).delete()
-    db.commit()
\ No newline at end of file
+    qry = db.query(Photo).filter(Photo.status == "ready")
+    if before_id is not None:
+        qry = qry.filter(Photo.id < before_id)
+    return qry.order_by(Photo.id.desc()).limit(limit).all()
@@ -1,10 +1,13 @@
 # backend/db.py
 
 import os
+from datetime import datetime, timezone
 import sqlalchemy as sa
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker,Session
 from typing import List
 
+from backend.cache import cached
+
 # ─────────────────────────────────────────────────────
 # 💾 חיבור ל-PostgreSQL (למשל Supabase)
 # ─────────────────────────────────────────────────────
@@ -32,6 +35,10 @@ Base = declarative_base()
 # ─────────────────────────────────────────────────────
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # get_unique_user_areas + סינון לפי אזור/הגעה
+        sa.Index("ix_users_area_is_coming", "area", "is_coming"),
+    )
 
     id            = sa.Column(sa.Integer, primary_key=True, index=True)
     name          = sa.Column(sa.Text, nullable=False)
@@ -57,6 +64,11 @@ class User(Base):
 # ─────────────────────────────────────────────────────
 class Seat(Base):
     __tablename__ = "seats"
+    # מונע שני כיסאות באותו מקום (למשל שני שולחנות עם אותו col באזור).
+    # האינדקס של האילוץ משרת גם חיפוש לפי (area, col) – delete_table, max(col).
+    __table_args__ = (
+        sa.UniqueConstraint("area", "col", "row", name="uq_seats_area_col_row"),
+    )
 
     id       = sa.Column(sa.Integer, primary_key=True, index=True)
     row      = sa.Column(sa.Integer, nullable=False)
@@ -64,21 +76,54 @@ class Seat(Base):
     area     = sa.Column(sa.Text, nullable=True)
     status   = sa.Column(sa.Text, default="free")  # ערכים: "free" / "taken"
 
-    owner_id = sa.Column(sa.Integer, sa.ForeignKey("users.id"), nullable=True)
+    owner_id = sa.Column(sa.Integer, sa.ForeignKey("users.id"), nullable=True, index=True)
     owner    = relationship("User", back_populates="seats")
 
+    # החזקה זמנית של אדמין באמצע שיבוץ (crud.place_hold) – פגה אוטומטית
+    held_by         = sa.Column(sa.Text, nullable=True)
+    hold_expires_at = sa.Column(sa.DateTime(timezone=True), nullable=True, index=True)
+
+    @property
+    def held(self) -> bool:
+        return (
+            self.hold_expires_at is not None
+            and self.hold_expires_at > datetime.now(timezone.utc)
+        )
+
 # ─────────────────────────────────────────────────────
-# 🧱 אתחול בסיס הנתונים (יצירת טבלאות אוטומטית)
+# 📷 טבלת תמונות של אורחים (הקבצים עצמם בדיסק – backend/photos.py)
+# ─────────────────────────────────────────────────────
+class Photo(Base):
+    __tablename__ = "photos"
+    __table_args__ = (
+        # פיד הגלריה: status='ready' ORDER BY id DESC
+        sa.Index("ix_photos_status_id", "status", "id"),
+    )
+
+    id         = sa.Column(sa.Integer, primary_key=True)
+    token      = sa.Column(sa.Text, nullable=False, unique=True)
+    uploader   = sa.Column(sa.Text, nullable=True)
+    status     = sa.Column(sa.Text, default="processing")  # ערכים: "processing" / "ready" / "failed"
+    created_at = sa.Column(sa.DateTime, server_default=sa.func.now())
+
+# ─────────────────────────────────────────────────────
+# 🧱 אתחול בסיס הנתונים (יצירת טבלאות אוטומטית + מיגרציות)
 # ─────────────────────────────────────────────────────
 def init_db():
     Base.metadata.create_all(bind=engine)
 
+    # DB קיים: מוסיף אינדקסים/אילוצים ש-create_all לא יוסיף לטבלה קיימת
+    from backend.migrations import upgrade
+    upgrade()
+
 
 
+@cached("users")
 def get_unique_user_areas(db: Session) -> List[str]:
     """
     שולף את רשימת האזורים הקיימים אצל משתמשים בלבד (ללא כפילויות).
     מסנן ערכי NULL.
+    התוצאה נשמרת ב-cache עד ה-commit הבא שמשנה את טבלת users.
     """
     # שליפת ערכים ייחודיים מעמודת area
     results = db.query(User.area).distinct().filter(User.area != None).all()
@@ -0,0 +1,74 @@
+# backend/gunicorn_conf.py
+#
+# מצב פרודקשן: כמה תהליכי uvicorn תחת gunicorn.
+#   gunicorn -c backend/gunicorn_conf.py backend.main:app
+#
+# משתני סביבה:
+#   WEB_CONCURRENCY   – מספר workers (ברירת מחדל: מספר ה-CPU הזמינים לקונטיינר)
+#   PORT              – פורט האזנה (ברירת מחדל 8000, Render מגדיר אותו לבד)
+#   GRACEFUL_TIMEOUT  – כמה שניות worker מקבל לסיים בקשות פתוחות אחרי SIGTERM
+
+import os
+
+
+def _available_cpus() -> int:
+    """
+    מספר ה-CPU שהתהליך באמת יכול להשתמש בהם:
+    מגבלת cgroup (Docker --cpus / Render) אם יש, אחרת affinity של התהליך.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+
+    return max(1, cpus)
+
+
+bind             = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class     = "uvicorn.workers.UvicornWorker"
+workers          = int(os.getenv("WEB_CONCURRENCY", _available_cpus()))
+
+# טוען את האפליקציה פעם אחת בתהליך הראשי (imports, חיבור ל-Sheets) ואז fork
+preload_app      = True
+
+# ניקוז בקשות פתוחות לפני יציאה (SIGTERM בזמן deploy)
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout          = 60
+keepalive        = 5
+
+accesslog        = "-"
+errorlog         = "-"
+
+
+def on_starting(server):
+    """
+    רץ פעם אחת בתהליך הראשי, לפני שנוצרים ה-workers.
+    ה-workers יורשים את DB_INITIALIZED ולכן מדלגים על init_db ב-startup.
+    התהליך הראשי לא מריץ שאילתות אחרי זה – סוגרים את החיבור שנשאר ב-pool,
+    כדי שלא יתפוס חיבור ל-DB מעבר לתקציב של ה-workers לכל חיי השרת.
+    """
+    from backend.db import engine, init_db
+
+    init_db()
+    engine.dispose()
+    os.environ["DB_INITIALIZED"] = "1"
+
+
+def post_fork(server, worker):
+    """
+    חיבורים פתוחים שנוצרו בתהליך הראשי לא יכולים להיות משותפים בין תהליכים.
+    כל worker מתחיל עם pool משלו ל-DB ולגוגל.
+    """
+    from backend.db import engine
+    import backend.sheets_repo as sheets
+
+    engine.dispose(close=False)
+    sheets.reset_connections()
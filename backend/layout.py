@@ -0,0 +1,159 @@
+# backend/layout.py
+
+from typing import Dict, List
+
+import sqlalchemy as sa
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.db import Seat
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  תבניות אולם
+#  כל תבנית היא רשימת אזורים: כמה שולחנות וכמה מקומות בכל שולחן.
+#  אפשר גם לשלוח תבנית מותאמת מה-API באותו מבנה בדיוק.
+# ─────────────────────────────────────────────────────────────────────────────
+LAYOUT_TEMPLATES: Dict[str, List[dict]] = {
+    "default": [
+        {"area": "אולם", "tables": 20, "capacity": 12},
+        {"area": "גן",   "tables": 10, "capacity": 10},
+    ],
+    "small": [
+        {"area": "אולם", "tables": 10, "capacity": 12},
+    ],
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  נעילה ומספור שולחנות
+# ─────────────────────────────────────────────────────────────────────────────
+def _lock_area(db: Session, area: str) -> None:
+    """
+    נועל את האזור עד סוף הטרנזקציה (pg_advisory_xact_lock).
+    כך שני אדמינים שמוסיפים שולחן באותו רגע מקבלים מספרי col שונים –
+    השני מחכה שהראשון יעשה commit ורק אז מחשב max(col).
+    ב-DB שאינו PostgreSQL (למשל SQLite בפיתוח) – אין נעילה, ה-UniqueConstraint עדיין מגן.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(sa.select(func.pg_advisory_xact_lock(func.hashtext(area))))
+
+
+def _next_col(db: Session, area: str) -> int:
+    max_col = db.query(func.max(Seat.col)).filter(Seat.area == area).scalar() or 0
+    return max_col + 1
+
+
+def _seat_rows(area: str, col: int, first_row: int, last_row: int) -> List[dict]:
+    return [
+        {"row": row, "col": col, "area": area, "status": "free", "owner_id": None}
+        for row in range(first_row, last_row + 1)
+    ]
+
+
+def _insert_seats(db: Session, rows: List[dict]) -> None:
+    """INSERT אחד מרובה-שורות במקום אובייקט ORM לכל כיסא."""
+    if rows:
+        db.execute(sa.insert(Seat).values(rows))
+
+
+def _owners_of(db: Session, *criteria) -> List[int]:
+    results = (
+        db.query(Seat.owner_id)
+        .filter(*criteria, Seat.owner_id != None)
+        .distinct()
+        .all()
+    )
+    return sorted(r[0] for r in results)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  פעולות על שולחנות
+# ─────────────────────────────────────────────────────────────────────────────
+def add_tables(db: Session, area: str, count: int, capacity: int) -> List[int]:
+    """
+    מוסיף count שולחנות לאזור, כל אחד עם capacity מקומות.
+    מחזיר את מספרי השולחנות (col) החדשים. לא עושה commit.
+    """
+    if count < 1 or capacity < 1:
+        raise ValueError("מספר השולחנות והמקומות חייב להיות חיובי.")
+
+    _lock_area(db, area)
+    first_col = _next_col(db, area)
+    cols = list(range(first_col, first_col + count))
+
+    rows: List[dict] = []
+    for col in cols:
+        rows.extend(_seat_rows(area, col, 1, capacity))
+    _insert_seats(db, rows)
+    return cols
+
+
+def provision_layout(db: Session, template: List[dict]) -> Dict[str, List[int]]:
+    """
+    מקים אולם שלם לפי תבנית: [{"area": ..., "tables": ..., "capacity": ...}, ...]
+    השולחנות מתווספים אחרי השולחנות הקיימים בכל אזור.
+    הכול בטרנזקציה אחת – או שכל האולם נבנה, או ששום דבר לא נשמר.
+    """
+    created: Dict[str, List[int]] = {}
+    try:
+        # נעילה בסדר קבוע של אזורים כדי ששתי תבניות במקביל לא ייתקעו ב-deadlock
+        for spec in sorted(template, key=lambda s: s["area"]):
+            cols = add_tables(db, spec["area"], spec["tables"], spec["capacity"])
+            created.setdefault(spec["area"], []).extend(cols)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return created
+
+
+def resize_table(db: Session, area: str, col: int, capacity: int) -> List[int]:
+    """
+    משנה את מספר המקומות בשולחן קיים בלי למחוק ולבנות אותו מחדש.
+    הגדלה – מוסיף שורות (row) אחרי האחרונה. הקטנה – מוחק את השורות העודפות.
+    מחזיר את ה-user_id של אורחים שישבו בכיסאות שנמחקו (הם חוזרים ל"רזרבה").
+    """
+    if capacity < 1:
+        raise ValueError("מספר המקומות חייב להיות חיובי.")
+
+    try:
+        _lock_area(db, area)
+        current = (
+            db.query(func.max(Seat.row))
+            .filter(Seat.area == area, Seat.col == col)
+            .scalar()
+        )
+        if current is None:
+            raise LookupError("השולחן לא נמצא.")
+
+        released: List[int] = []
+        if capacity > current:
+            _insert_seats(db, _seat_rows(area, col, current + 1, capacity))
+        elif capacity < current:
+            extra = (Seat.area == area, Seat.col == col, Seat.row > capacity)
+            released = _owners_of(db, *extra)
+            db.query(Seat).filter(*extra).delete(synchronize_session=False)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return released
+
+
+def delete_table(db: Session, area: str, col: int) -> List[int]:
+    """
+    מוחק את כל הכיסאות של השולחן ומחזיר את ה-user_id של האורחים שישבו בו,
+    כדי שהאדמין ידע את מי צריך להושיב מחדש.
+    """
+    criteria = (Seat.area == area, Seat.col == col)
+    try:
+        _lock_area(db, area)
+        released = _owners_of(db, *criteria)
+        db.query(Seat).filter(*criteria).delete(synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return released
@@ -4,16 +4,21 @@ import os
 import hmac
 import hashlib
 import time
-from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Header
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Header, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from starlette.requests import ClientDisconnect
 from sqlalchemy.orm import Session
 import sqlalchemy as sa
 
-from backend.db import SessionLocal, init_db, User, Seat, get_unique_user_areas
+from backend.db import SessionLocal, init_db, User, get_unique_user_areas
 import backend.schemas as schemas
+import backend.cache as cache
 import backend.crud as crud
+import backend.layout as layout
+import backend.photos as photos
 import backend.sheets_repo as sheets
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -59,7 +64,38 @@ def get_db():
 
 @app.on_event("startup")
 def on_startup():
-    init_db()
+    # תחת gunicorn (gunicorn_conf.py) init_db כבר רץ פעם אחת בתהליך הראשי
+    if os.getenv("DB_INITIALIZED") != "1":
+        init_db()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    # מסיים עיבוד תמונות שכבר בתור לפני שה-worker יוצא
+    photos.shutdown()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  HEALTH
+#  live  – התהליך חי ועונה (בלי תלות חיצונית).
+#  ready – DB עונה ו-Google Sheets נגיש; אחרת 503 כדי שה-LB לא ישלח תנועה.
+# ─────────────────────────────────────────────────────────────────────────────
+@api.get("/health/live")
+def health_live():
+    return {"ok": True}
+
+
+@api.get("/health/ready")
+def health_ready(db: Session = Depends(get_db)):
+    checks = {"db": False, "sheets": sheets.is_ready()}
+    try:
+        db.execute(sa.text("SELECT 1"))
+        checks["db"] = True
+    except Exception as e:
+        print(f"DB readiness check failed: {e}")
+    if not all(checks.values()):
+        raise HTTPException(status_code=503, detail=checks)
+    return {"ok": True, **checks}
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -169,25 +205,47 @@ def admin_login(data: AdminLoginIn):
 @api.post("/users/login", response_model=schemas.UserOut)
 def login(data: schemas.UserBase, db: Session = Depends(get_db)):
     """התחברות / רישום מהיר של אורח – לא דורש טוקן אדמין."""
-    user = db.query(User).filter(
-        sa.or_(User.phone == data.phone, User.Phone2 == data.phone)
-    ).first()
-    if not user:
-        user = crud.create_user(db, {
-            "name":      data.name,
-            "phone":     data.phone,
-            "user_type": "אורח לא רשום",
-        })
-    return user
+    return crud.get_or_create_guest(db, data.name, data.phone)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  GUEST BOOTSTRAP
+#  כל מה שמסך ה-RSVP צריך בבקשה אחת: האורח, הכיסאות שלו, האזורים ועמוד ברכות ראשון.
+#  חלקי ה-DB רצים ב-Session אחד; הברכות מגיעות מ-cache קצר ב-sheets_repo
+#  שמתרענן ברקע, כך שגוגל איטי (או תקוע) לא מעכב את הכניסה.
+# ─────────────────────────────────────────────────────────────────────────────
+BLESSINGS_PAGE_SIZE = 20
+
+
+@api.post("/guest/bootstrap", response_model=schemas.GuestBootstrapOut)
+def guest_bootstrap(data: schemas.GuestBootstrapIn, db: Session = Depends(get_db)):
+    """
+    create=False – רק אורח קיים (404 אחרת), כדי שהלקוח ישאל "בטוח שזה המספר?" לפני יצירה.
+    """
+    if data.create:
+        user = crud.get_or_create_guest(db, data.name, data.phone)
+    else:
+        user = crud.find_guest(db, data.phone)
+        if user is None:
+            raise HTTPException(status_code=404, detail="Guest not found")
+    seats = crud.seats_of_user(db, user.id)
+    areas = get_unique_user_areas(db)
+
+    blessings, blessings_loaded = sheets.cached_blessings()
+
+    return {
+        "user":             schemas.UserOut.model_validate(user),
+        "seats":            seats,
+        "areas":            areas,
+        "blessings":        blessings[:BLESSINGS_PAGE_SIZE],
+        "blessings_loaded": blessings_loaded,
+    }
 
 
 @api.get("/users/check-phone")
 def check_phone_endpoint(phone: str = Query(...), db: Session = Depends(get_db)):
     """בדיקת קיום מספר טלפון – ללא החזרת מידע אישי."""
-    exists = db.query(User).filter(
-        sa.or_(User.phone == phone.strip(), User.Phone2 == phone.strip())
-    ).first() is not None
-    return {"exists": exists}
+    return {"exists": crud.phone_exists(db, phone.strip())}
 
 
 _GUEST_SEARCH_MIN = 2
@@ -272,6 +330,7 @@ def update_user_endpoint(
     _:       None    = Depends(require_admin),
 ):
     seat_ids = payload.pop("seat_ids", None)
+    hold_id  = payload.pop("hold_id", None)
     try:
         user = crud.update_user(db, user_id, payload)
         if not user:
@@ -279,7 +338,7 @@ def update_user_endpoint(
 
         if seat_ids is not None:
             try:
-                crud.assign_seats(db, seat_ids, user_id)
+                crud.assign_seats(db, seat_ids, user_id, hold_id)
             except ValueError as ve:
                 raise HTTPException(status_code=400, detail=str(ve))
 
@@ -319,7 +378,7 @@ def list_seats(
 @api.get("/seats/user/{uid}", response_model=list[schemas.SeatOut])
 def seats_by_user(uid: int, db: Session = Depends(get_db)):
     """פתוח לאורח עצמו."""
-    return db.query(Seat).filter(Seat.owner_id == uid).all()
+    return crud.seats_of_user(db, uid)
 
 
 @api.put("/seats/assign")
@@ -329,12 +388,41 @@ def assign_seats_endpoint(
     _:       None    = Depends(require_admin),
 ):
     try:
-        crud.assign_seats(db, payload["seat_ids"], payload["user_id"])
+        crud.assign_seats(db, payload["seat_ids"], payload["user_id"], payload.get("hold_id"))
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     return {"ok": True}
 
 
+@api.post("/seats/hold")
+def place_hold_endpoint(
+    data: schemas.SeatHoldIn,
+    db:   Session = Depends(get_db),
+    _:    None    = Depends(require_admin),
+):
+    """
+    החזקה קצרה על כיסאות בזמן שהאדמין מאשר שיבוץ (בלי נעילת שורות).
+    השיבוץ עצמו: PUT /users/{id} או /seats/assign עם אותו hold_id.
+    קריאה חוזרת עם אותו hold_id מחדשת את ההחזקה ל-HOLD_TTL נוסף.
+    """
+    crud.sweep_expired_holds(db)
+    try:
+        hold_id = crud.place_hold(db, data.seat_ids, data.user_id, data.hold_id)
+    except ValueError as ve:
+        raise HTTPException(status_code=409, detail=str(ve))
+    return {"ok": True, "hold_id": hold_id, "ttl": int(crud.HOLD_TTL.total_seconds())}
+
+
+@api.delete("/seats/hold/{hold_id}")
+def release_hold_endpoint(
+    hold_id: str,
+    db:      Session = Depends(get_db),
+    _:       None    = Depends(require_admin),
+):
+    crud.release_hold(db, hold_id)
+    return {"ok": True}
+
+
 @api.post("/seats/table")
 def create_table_endpoint(
     payload: dict,
@@ -345,7 +433,15 @@ def create_table_endpoint(
     capacity = payload.get("capacity", 12)
     if not area:
         raise HTTPException(status_code=400, detail="Area is required")
-    new_col = crud.create_new_table(db, area, capacity)
+    if not isinstance(capacity, int) or not 1 <= capacity <= schemas.MAX_TABLE_CAPACITY:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Capacity must be between 1 and {schemas.MAX_TABLE_CAPACITY}",
+        )
+    try:
+        new_col = crud.create_new_table(db, area, capacity)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     return {"ok": True, "new_col": new_col}
 
 
@@ -356,8 +452,59 @@ def delete_table_endpoint(
     db:   Session = Depends(get_db),
     _:    None    = Depends(require_admin),
 ):
-    crud.delete_table(db, area, col)
-    return {"ok": True}
+    released = crud.delete_table(db, area, col)
+    return {"ok": True, "released_user_ids": released}
+
+
+@api.put("/seats/table")
+def resize_table_endpoint(
+    data: schemas.TableResizeIn,
+    db:   Session = Depends(get_db),
+    _:    None    = Depends(require_admin),
+):
+    """שינוי מספר המקומות בשולחן קיים – מחזיר את האורחים שהכיסאות שלהם בוטלו."""
+    try:
+        released = layout.resize_table(db, data.area, data.col, data.capacity)
+    except LookupError as le:
+        raise HTTPException(status_code=404, detail=str(le))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return {"ok": True, "released_user_ids": released}
+
+
+@api.get("/seats/layout/templates")
+def list_layout_templates(_: None = Depends(require_admin)):
+    return layout.LAYOUT_TEMPLATES
+
+
+@api.post("/seats/layout")
+def provision_layout_endpoint(
+    data: schemas.LayoutIn,
+    db:   Session = Depends(get_db),
+    _:    None    = Depends(require_admin),
+):
+    """הקמת אולם שלם מתבנית (שם תבנית מוכנה או רשימת אזורים) בטרנזקציה אחת."""
+    if data.areas:
+        template = [a.dict() for a in data.areas]
+    elif data.template in layout.LAYOUT_TEMPLATES:
+        template = layout.LAYOUT_TEMPLATES[data.template]
+    else:
+        raise HTTPException(status_code=400, detail="Unknown layout template")
+    try:
+        created = layout.provision_layout(db, template)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return {"ok": True, "tables": created}
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+#  CACHE
+# ═════════════════════════════════════════════════════════════════════════════
+
+@api.get("/cache/stats")
+def cache_stats_endpoint(_: None = Depends(require_admin)):
+    """מונים של ה-worker שענה על הבקשה (hits/misses לכל פונקציה)."""
+    return cache.stats()
 
 
 # ═════════════════════════════════════════════════════════════════════════════
@@ -375,9 +522,15 @@ def add_blessing_endpoint(data: schemas.BlessingIn):
 
 
 @api.get("/blessing")
-def get_blessings_endpoint():
+def get_blessings_endpoint(
+    offset: int        = Query(0, ge=0),
+    limit:  int | None = Query(None, ge=1),
+):
+    """ללא limit – כל הברכות (החדשות ראשונות). עם limit – עמוד אחד."""
     try:
-        return sheets.get_blessings()
+        blessings = sheets.get_blessings()
+        end = offset + limit if limit is not None else None
+        return blessings[offset:end]
     except Exception as e:
         print(f"Google Sheets Error (Get Blessings): {e}")
         return []
@@ -412,6 +565,118 @@ def add_feedback_endpoint(data: schemas.FeedbackIn):
         raise HTTPException(status_code=503, detail="שגיאה מול השרתים של גוגל.")
 
 
+# ═════════════════════════════════════════════════════════════════════════════
+#  PHOTOS  (פתוח לאורחים – ראו backend/photos.py לפרוטוקול ההעלאה)
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _upload_error(e: photos.UploadError) -> HTTPException:
+    headers = {}
+    if e.offset is not None:
+        headers["Upload-Offset"] = str(e.offset)
+    if e.status_code == 503:
+        headers["Retry-After"] = str(photos.RETRY_AFTER)
+    return HTTPException(status_code=e.status_code, detail=e.detail, headers=headers or None)
+
+
+def _on_photo_processed(token: str, ok: bool) -> None:
+    db = SessionLocal()
+    try:
+        crud.set_photo_status(db, token, "ready" if ok else "failed")
+    finally:
+        db.close()
+
+
+def _finish_photo(writer: photos.ChunkWriter) -> None:
+    """
+    תור → שורה ב-DB → העברת הקובץ, בסדר הזה: אם ה-INSERT נכשל המקום בתור
+    מתפנה והקובץ החלקי + המטא-דאטה נשארים, כך שהלקוח יכול לנסות שוב את אותו PATCH.
+    """
+    writer.reserve()
+    db = SessionLocal()
+    try:
+        crud.create_photo(db, writer.token, writer.meta.get("uploader"))
+        original = writer.finish()
+    except Exception:
+        writer.release()
+        raise
+    finally:
+        db.close()
+    photos.submit(original, writer.token, _on_photo_processed)
+
+
+@api.post("/photos/uploads", status_code=201)
+def create_photo_upload(data: schemas.PhotoUploadIn):
+    try:
+        token = photos.create_upload(data.size, data.content_type, data.uploader)
+    except photos.UploadError as e:
+        raise _upload_error(e)
+    return {"token": token, "offset": 0, "max_bytes": photos.MAX_UPLOAD_BYTES}
+
+
+@api.get("/photos/uploads/{token}")
+def photo_upload_status(token: str):
+    """להמשך העלאה אחרי ניתוק – מחזיר כמה בייטים השרת כבר שמר."""
+    try:
+        meta = photos.get_upload(token)
+    except photos.UploadError as e:
+        raise _upload_error(e)
+    return {"token": token, "offset": meta["offset"], "size": meta["size"]}
+
+
+@api.patch("/photos/uploads/{token}")
+async def upload_photo_chunk(
+    token:         str,
+    request:       Request,
+    upload_offset: int = Header(...),
+):
+    """
+    גוף הבקשה = bytes גולמיים מ-Upload-Offset והלאה.
+    נכתב לדיסק chunk אחרי chunk בזמן שהוא מגיע – הקובץ לא נשמר כולו בזיכרון.
+    אם תור העיבוד מלא כשההעלאה מסתיימת – 503 + Retry-After, והלקוח שולח שוב
+    PATCH ריק עם Upload-Offset = size.
+    """
+    try:
+        writer = await run_in_threadpool(photos.ChunkWriter, token, upload_offset)
+    except photos.UploadError as e:
+        raise _upload_error(e)
+
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await run_in_threadpool(writer.write, chunk)
+        if writer.complete:
+            await run_in_threadpool(_finish_photo, writer)
+    except photos.UploadError as e:
+        raise _upload_error(e)
+    except ClientDisconnect:
+        pass  # מה שנכתב נשאר – הלקוח ממשיך מה-offset ב-GET
+    finally:
+        await run_in_threadpool(writer.close)
+
+    return {"token": token, "offset": writer.offset, "complete": writer.complete}
+
+
+@api.get("/photos", response_model=schemas.PhotoFeedOut)
+def photo_feed_endpoint(
+    before: int | None = Query(None),
+    limit:  int        = Query(24, ge=1, le=100),
+    db:     Session    = Depends(get_db),
+):
+    rows = crud.photo_feed(db, before, limit)
+    return {
+        "photos": [
+            {
+                "id":        p.id,
+                "uploader":  p.uploader,
+                "thumb_url": f"/media/photos/{photos.media_path(photos.THUMB, p.token)}",
+                "web_url":   f"/media/photos/{photos.media_path(photos.WEB, p.token)}",
+            }
+            for p in rows
+        ],
+        "next_cursor": rows[-1].id if len(rows) == limit else None,
+    }
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  ROUTER + SPA FALLBACK
 #  ⚠️  include_router חייב להיות אחרי כל הגדרות הנתיבים ב-api router
@@ -419,9 +684,30 @@ def add_feedback_endpoint(data: schemas.FeedbackIn):
 app.include_router(api)
 
 
+# קבצי תמונות נקראים לפי token אקראי ולא משתנים אף פעם – הדפדפן יכול לשמור אותם לתמיד
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+def _static_file(root: str, rel_path: str, cache_control: str | None = None) -> FileResponse | None:
+    """מחזיר FileResponse לקובץ בתוך root, או None אם אין קובץ כזה (או ניסיון לצאת מ-root)."""
+    root      = os.path.realpath(root)
+    file_path = os.path.realpath(os.path.join(root, rel_path))
+    if not file_path.startswith(root + os.sep) or not os.path.isfile(file_path):
+        return None
+    headers = {"Cache-Control": cache_control} if cache_control else None
+    return FileResponse(file_path, headers=headers)
+
+
+@app.get("/media/photos/{kind}/{name}")
+def serve_photo(kind: str, name: str):
+    response = None
+    if kind in (photos.WEB, photos.THUMB):
+        response = _static_file(photos.PHOTOS_DIR, f"{kind}/{name}", IMMUTABLE_CACHE)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return response
+
+
 @app.get("/{catchall:path}")
 def serve_react_app(catchall: str):
-    file_path = os.path.join("static", catchall)
-    if os.path.isfile(file_path):
-        return FileResponse(file_path)
-    return FileResponse("static/index.html")
+    return _static_file("static", catchall) or FileResponse("static/index.html")
@@ -0,0 +1,207 @@
+# backend/migrations.py
+#
+# מיגרציות ממוספרות ל-DB קיים.
+# create_all יוצר טבלאות חסרות בלבד – הוא לא מוסיף אינדקסים/אילוצים לטבלה שכבר קיימת.
+# כל מיגרציה כאן רצה פעם אחת ונרשמת ב-schema_migrations.
+# כמעט כולן DDL בלבד; היוצאת מן הכלל היא מיגרציה 2, שמשנה מספרי שולחנות (seats.col)
+# של שולחנות כפולים – ומדפיסה כל העברה, כדי שאפשר יהיה לעדכן את האורחים שיושבים בהם.
+#
+#   python -m backend.migrations upgrade   – מריץ מיגרציות שעוד לא רצו
+#   python -m backend.migrations status    – מה רץ ומה ממתין
+#   python -m backend.migrations plans     – בודק שהשאילתות החמות עוברות דרך אינדקס
+
+import sys
+from typing import Callable, List, Tuple, Union
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Connection
+
+from backend.db import engine
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  צעדי מיגרציה שצריכים יותר מ-DDL אחד
+# ─────────────────────────────────────────────────────────────────────────────
+_RENUMBER_DUPLICATE_TABLES = """
+WITH ranked AS (
+    SELECT id, area, col,
+           row_number() OVER (PARTITION BY area, col, row ORDER BY id) AS k
+    FROM seats
+    WHERE area IS NOT NULL
+),
+moves AS (
+    SELECT DISTINCT area, col, k FROM ranked WHERE k > 1
+),
+numbered AS (
+    SELECT m.area, m.col, m.k,
+           (SELECT max(s.col) FROM seats s WHERE s.area = m.area)
+             + row_number() OVER (PARTITION BY m.area ORDER BY m.col, m.k) AS new_col
+    FROM moves m
+)
+UPDATE seats
+SET col = n.new_col
+FROM ranked r
+JOIN numbered n ON n.area = r.area AND n.col = r.col AND n.k = r.k
+WHERE seats.id = r.id
+RETURNING seats.area, r.col AS old_col, n.new_col, seats.owner_id
+"""
+
+
+def _renumber_duplicate_tables(conn: Connection) -> None:
+    """
+    לפני התיקון של ה-race ב-create_new_table, שני אדמינים יכלו לקבל אותו col באזור,
+    ואז יש כפילויות (area, col, row) שחוסמות את האינדקס הייחודי.
+    השולחן שנוצר ראשון (id נמוך) נשאר; כל עותק נוסף עובר ל-col פנוי בסוף האזור.
+    שום שורה לא נמחקת – אבל אורחים שישבו בעותק עוברים למספר שולחן חדש,
+    לכן כל העברה מודפסת עם ה-user_id של האורחים שלה.
+    """
+    moves: dict = {}
+    for area, old_col, new_col, owner_id in conn.execute(sa.text(_RENUMBER_DUPLICATE_TABLES)):
+        owners = moves.setdefault((area, old_col, new_col), set())
+        if owner_id is not None:
+            owners.add(owner_id)
+    for (area, old_col, new_col), owners in sorted(moves.items()):
+        guests = ", ".join(map(str, sorted(owners))) or "none"
+        print(f"⚠️  migration: area {area!r}: duplicate table {old_col} → {new_col} (guests: {guests})")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  רשימת המיגרציות – להוסיף רק בסוף, לעולם לא לשנות מיגרציה שכבר פורסמה.
+#  כל פקודה חייבת להיות אידמפוטנטית (IF NOT EXISTS), כי ב-DB חדש
+#  create_all כבר יצר את האינדקסים מתוך המודלים ב-db.py.
+#  צעד הוא SQL (str) או פונקציה שמקבלת Connection.
+# ─────────────────────────────────────────────────────────────────────────────
+Step = Union[str, Callable[[Connection], None]]
+
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (
+        1,
+        "indexes for hot filters (seats.owner_id, users.area/is_coming)",
+        [
+            "CREATE INDEX IF NOT EXISTS ix_seats_owner_id ON seats (owner_id)",
+            "CREATE INDEX IF NOT EXISTS ix_users_area_is_coming ON users (area, is_coming)",
+        ],
+    ),
+    (
+        2,
+        "unique (area, col, row) on seats – also serves (area, col) lookups",
+        [
+            _renumber_duplicate_tables,
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_seats_area_col_row ON seats (area, col, row)",
+        ],
+    ),
+    (
+        3,
+        "seat holds (seats.held_by, seats.hold_expires_at)",
+        [
+            "ALTER TABLE seats ADD COLUMN IF NOT EXISTS held_by TEXT",
+            "ALTER TABLE seats ADD COLUMN IF NOT EXISTS hold_expires_at TIMESTAMP WITH TIME ZONE",
+            "CREATE INDEX IF NOT EXISTS ix_seats_hold_expires_at ON seats (hold_expires_at)",
+        ],
+    ),
+]
+
+_CREATE_VERSIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version     INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    applied_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# מפתח קבוע ל-advisory lock, כדי ששני תהליכים לא יריצו מיגרציות במקביל
+_MIGRATION_LOCK_KEY = 72_410_001
+
+
+def _lock(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        conn.execute(sa.text("SELECT pg_advisory_xact_lock(:k)"), {"k": _MIGRATION_LOCK_KEY})
+
+
+def applied_versions(conn: Connection) -> set:
+    conn.execute(sa.text(_CREATE_VERSIONS_TABLE))
+    return {r[0] for r in conn.execute(sa.text("SELECT version FROM schema_migrations"))}
+
+
+def upgrade() -> List[int]:
+    """
+    מריץ את כל המיגרציות שעוד לא רצו, כל אחת בטרנזקציה משלה.
+    מחזיר את מספרי הגרסאות שהוחלו עכשיו.
+    """
+    done: List[int] = []
+    for version, description, statements in MIGRATIONS:
+        with engine.begin() as conn:
+            _lock(conn)
+            # בדיקה מחדש תחת הנעילה – אולי תהליך אחר כבר החיל אותה
+            if version in applied_versions(conn):
+                continue
+            for step in statements:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(sa.text(step))
+            conn.execute(
+                sa.text("INSERT INTO schema_migrations (version, description) VALUES (:v, :d)"),
+                {"v": version, "d": description},
+            )
+        print(f"✅ migration {version} applied: {description}")
+        done.append(version)
+    return done
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  בדיקת תוכניות שאילתה (PostgreSQL בלבד)
+#  על טבלה קטנה Postgres יעדיף seq scan גם כשיש אינדקס, לכן הבדיקה מכבה
+#  seq scan בתוך הטרנזקציה: אם עדיין אין Index Scan – חסר אינדקס שמתאים לשאילתה.
+# ─────────────────────────────────────────────────────────────────────────────
+HOT_QUERIES = {
+    "seats_by_owner":   ("SELECT * FROM seats WHERE owner_id = :p", {"p": 1}),
+    "seats_by_table":   ("SELECT * FROM seats WHERE area = :a AND col = :c", {"a": "x", "c": 1}),
+    "max_col_in_area":  ("SELECT max(col) FROM seats WHERE area = :a", {"a": "x"}),
+    "user_areas":       ("SELECT DISTINCT area FROM users WHERE area IS NOT NULL", {}),
+    "expired_holds":    ("SELECT id FROM seats WHERE hold_expires_at <= now()", {}),
+    "coming_in_area":   ("SELECT id FROM users WHERE area = :a AND is_coming = :i", {"a": "x", "i": "כן"}),
+}
+
+
+def check_query_plans() -> dict:
+    """
+    מחזיר {שם_שאילתה: True/False} – האם התוכנית משתמשת באינדקס.
+    """
+    results = {}
+    with engine.connect() as conn:
+        if conn.dialect.name != "postgresql":
+            raise RuntimeError("check_query_plans דורש PostgreSQL")
+        trans = conn.begin()
+        try:
+            conn.execute(sa.text("SET LOCAL enable_seqscan = off"))
+            for name, (sql, params) in HOT_QUERIES.items():
+                plan = "\n".join(r[0] for r in conn.execute(sa.text(f"EXPLAIN {sql}"), params))
+                results[name] = "Index" in plan
+        finally:
+            trans.rollback()
+    return results
+
+
+def main(argv: List[str]) -> int:
+    cmd = argv[1] if len(argv) > 1 else "upgrade"
+    if cmd == "upgrade":
+        upgrade()
+        return 0
+    if cmd == "status":
+        with engine.begin() as conn:
+            applied = applied_versions(conn)
+        for version, description, _ in MIGRATIONS:
+            mark = "✅" if version in applied else "⏳"
+            print(f"{mark} {version}: {description}")
+        return 0
+    if cmd == "plans":
+        results = check_query_plans()
+        for name, ok in results.items():
+            print(f"{'✅' if ok else '❌'} {name}")
+        return 0 if all(results.values()) else 1
+    print(f"unknown command: {cmd} (upgrade / status / plans)")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
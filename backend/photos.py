@@ -0,0 +1,372 @@
+# backend/photos.py
+#
+# העלאת תמונות של אורחים לדיסק המקומי.
+#
+# פרוטוקול העלאה שאפשר לחדש (בדומה ל-tus):
+#   1. POST  /api/photos/uploads          – פותח העלאה עם הגודל הצפוי, מחזיר token
+#   2. PATCH /api/photos/uploads/{token}  – שולח chunk; כותרת Upload-Offset = כמה כבר נשלח
+#   3. GET   /api/photos/uploads/{token}  – אחרי ניתוק: מה ה-offset שהשרת שמר, ומשם ממשיכים
+#
+# ה-offset הוא פשוט גודל הקובץ החלקי בדיסק, לכן כל worker יכול להמשיך העלאה של worker אחר.
+# כשהקובץ הושלם – יצירת גרסת web ו-thumbnail (בלי EXIF) רצה ב-process pool, מחוץ לבקשה.
+#
+# גם מגבלות העומס נשמרות בדיסק ולכן משותפות לכל ה-workers:
+#   - partial/  – העלאות פתוחות; לכל היותר MAX_OPEN_UPLOADS, ומה שלא נגעו בו UPLOAD_EXPIRY נמחק
+#   - queued/   – סימון לכל תמונה שממתינה לעיבוד; לכל היותר MAX_PENDING.
+#     אם התור מלא, ה-PATCH המסיים מקבל 503 + Retry-After והקובץ החלקי נשמר –
+#     הלקוח שולח שוב PATCH ריק עם Upload-Offset = size.
+#
+# ⚠️  המודול לא מייבא את backend.db: תהליכי ה-pool מייבאים אותו מחדש (spawn)
+#     ולא צריכים חיבור ל-DB או ל-Google.
+
+import fcntl
+import json
+import multiprocessing
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Optional
+
+PHOTOS_DIR         = os.getenv("PHOTOS_DIR", "media/photos")
+MAX_UPLOAD_BYTES   = int(os.getenv("PHOTO_MAX_BYTES", str(30 * 1024 * 1024)))
+PROCESS_WORKERS    = int(os.getenv("PHOTO_WORKERS", "2"))
+MAX_PENDING        = int(os.getenv("PHOTO_MAX_PENDING", "32"))        # תמונות בתור לעיבוד (כל ה-workers)
+MAX_OPEN_UPLOADS   = int(os.getenv("PHOTO_MAX_OPEN_UPLOADS", "200"))  # העלאות פתוחות (כל ה-workers)
+UPLOAD_EXPIRY      = int(os.getenv("PHOTO_UPLOAD_EXPIRY", "3600"))    # שניות בלי כתיבה עד שהעלאה נמחקת
+JOB_TIMEOUT        = 300   # סימון בתור ישן מזה – worker שנפל באמצע; לא נספר
+SWEEP_INTERVAL     = 60    # לכל היותר סריקת ניקוי אחת בדקה לכל worker
+RETRY_AFTER        = 10
+
+WEB_MAX_SIDE   = 1600
+THUMB_MAX_SIDE = 400
+
+ALLOWED_TYPES = {
+    "image/jpeg": ".jpg",
+    "image/png":  ".png",
+    "image/webp": ".webp",
+}
+
+PARTIAL, QUEUED, ORIGINAL, WEB, THUMB = "partial", "queued", "original", "web", "thumb"
+
+
+class UploadError(Exception):
+    """שגיאה בהעלאה – status_code הוא קוד ה-HTTP שיוחזר ללקוח."""
+
+    def __init__(self, status_code: int, detail: str, offset: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.offset = offset
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  נתיבים
+# ─────────────────────────────────────────────────────────────────────────────
+def _dir(kind: str) -> str:
+    path = os.path.join(PHOTOS_DIR, kind)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _check_token(token: str) -> str:
+    # token נוצר ע"י secrets.token_hex – כל דבר אחר הוא ניסיון לברוח מהתיקייה
+    if len(token) != 32 or not all(c in "0123456789abcdef" for c in token):
+        raise UploadError(404, "Upload not found")
+    return token
+
+
+def _meta_path(token: str) -> str:
+    return os.path.join(_dir(PARTIAL), f"{token}.json")
+
+
+def _part_path(token: str) -> str:
+    return os.path.join(_dir(PARTIAL), f"{token}.part")
+
+
+def _queued_path(token: str) -> str:
+    return os.path.join(_dir(QUEUED), token)
+
+
+@contextmanager
+def _global_lock():
+    """נעילה בין תהליכים (flock) לבדיקת מגבלה + יצירת הקובץ, כדי שלא נעבור את המגבלה במקביל."""
+    os.makedirs(PHOTOS_DIR, exist_ok=True)
+    with open(os.path.join(PHOTOS_DIR, ".lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def media_path(kind: str, token: str) -> str:
+    """נתיב יחסי ל-PHOTOS_DIR של גרסת web/thumb (תמיד JPEG)."""
+    return f"{kind}/{token}.jpg"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  העלאה
+# ─────────────────────────────────────────────────────────────────────────────
+def create_upload(size: int, content_type: str, uploader: Optional[str]) -> str:
+    if content_type not in ALLOWED_TYPES:
+        raise UploadError(415, "Only JPEG / PNG / WebP photos are supported")
+    if size <= 0 or size > MAX_UPLOAD_BYTES:
+        raise UploadError(413, f"Photo must be smaller than {MAX_UPLOAD_BYTES // (1024 * 1024)}MB")
+    if pending_jobs() >= MAX_PENDING:
+        # backpressure מוקדם: עדיף לדחות לפני שהאורח שולח מגה-בייטים
+        raise UploadError(503, "Too many photos are being processed, try again shortly")
+
+    sweep_stale_uploads()
+    token = secrets.token_hex(16)
+    with _global_lock():
+        if open_uploads() >= MAX_OPEN_UPLOADS:
+            raise UploadError(503, "Too many uploads in progress, try again shortly")
+        with open(_meta_path(token), "w") as f:
+            json.dump({"size": size, "content_type": content_type, "uploader": uploader}, f)
+        open(_part_path(token), "wb").close()
+    return token
+
+
+def open_uploads() -> int:
+    return sum(1 for name in os.listdir(_dir(PARTIAL)) if name.endswith(".json"))
+
+
+_last_sweep = 0.0
+
+
+def sweep_stale_uploads(force: bool = False) -> int:
+    """
+    מוחק העלאות שלא נכתב אליהן כלום UPLOAD_EXPIRY שניות (אורח שנטש / בקשות זדוניות),
+    וסימוני תור ישנים של workers שנפלו. מוגבל לפעם ב-SWEEP_INTERVAL. מחזיר כמה העלאות נמחקו.
+    """
+    global _last_sweep
+    now = time.time()
+    if not force and now - _last_sweep < SWEEP_INTERVAL:
+        return 0
+    _last_sweep = now
+
+    removed = 0
+    for name in os.listdir(_dir(PARTIAL)):
+        if not name.endswith(".json"):
+            continue
+        token = name[:-len(".json")]
+        try:
+            if _remove_if_stale(token, now - UPLOAD_EXPIRY):
+                removed += 1
+        except OSError:
+            pass  # נמחק/הושלם בינתיים ע"י worker אחר
+
+    for entry in os.scandir(_dir(QUEUED)):
+        mtime = _marker_mtime(entry)
+        if mtime is not None and mtime < now - JOB_TIMEOUT:
+            _release_slot(entry.name)
+    return removed
+
+
+def _remove_if_stale(token: str, cutoff: float) -> bool:
+    meta, part = _meta_path(token), _part_path(token)
+    last_write = max(os.path.getmtime(meta), os.path.getmtime(part) if os.path.exists(part) else 0)
+    if last_write >= cutoff:
+        return False
+    if os.path.exists(part):
+        with open(part, "rb") as f:
+            try:
+                # PATCH פעיל מחזיק flock – לא מוחקים מתחת לרגליים שלו
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            os.remove(part)
+    os.remove(meta)
+    return True
+
+
+def get_upload(token: str) -> dict:
+    """מטא-דאטה של העלאה פתוחה + offset נוכחי (גודל הקובץ החלקי)."""
+    _check_token(token)
+    try:
+        with open(_meta_path(token)) as f:
+            meta = json.load(f)
+        meta["offset"] = os.path.getsize(_part_path(token))
+    except FileNotFoundError:
+        raise UploadError(404, "Upload not found")
+    return meta
+
+
+class ChunkWriter:
+    """
+    כותב chunk אחד להעלאה, תחת flock על הקובץ החלקי –
+    שתי בקשות PATCH במקביל לאותה העלאה לא יכתבו אחת על השנייה.
+    """
+
+    def __init__(self, token: str, offset: int):
+        self.meta = get_upload(token)
+        self.token = token
+        try:
+            self.file = open(_part_path(token), "r+b")
+        except FileNotFoundError:
+            # PATCH מקביל סיים את ההעלאה, או שהניקוי מחק אותה, אחרי get_upload
+            raise UploadError(404, "Upload not found")
+        try:
+            fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self.file.close()
+            raise UploadError(409, "Upload is busy", offset=self.meta["offset"])
+
+        current = os.fstat(self.file.fileno()).st_size
+        if offset != current:
+            self.close()
+            raise UploadError(409, "Upload-Offset mismatch", offset=current)
+        self.file.seek(current)
+        self.offset = current
+
+    def write(self, chunk: bytes) -> None:
+        if self.offset + len(chunk) > self.meta["size"]:
+            # לא משאירים שאריות מעבר לגודל שהוצהר
+            self.file.truncate(self.offset)
+            raise UploadError(413, "More bytes than declared", offset=self.offset)
+        self.file.write(chunk)
+        self.offset += len(chunk)
+
+    @property
+    def complete(self) -> bool:
+        return self.offset == self.meta["size"]
+
+    def reserve(self) -> None:
+        """
+        נקרא כשההעלאה הושלמה, עוד תחת הנעילה – PATCH כפול לא יסיים פעמיים.
+        תופס מקום בתור העיבוד; אם התור מלא – 503, והקובץ החלקי נשאר לניסיון הבא.
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        if not _reserve_slot(self.token):
+            raise UploadError(503, "Too many photos are being processed, try again shortly",
+                              offset=self.offset)
+
+    def release(self) -> None:
+        """מחזיר את המקום בתור אם משהו נכשל בין reserve ל-finish; ההעלאה נשארת פתוחה."""
+        _release_slot(self.token)
+
+    def finish(self) -> str:
+        """
+        אחרי reserve ואחרי שהשורה ב-DB נוצרה: מעביר את הקובץ ל-original/.
+        מכאן ההעלאה כבר לא ניתנת לחידוש, לכן זה הצעד האחרון.
+        """
+        return finish_upload(self.token, self.meta["content_type"])
+
+    def close(self) -> None:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+
+def finish_upload(token: str, content_type: str) -> str:
+    """מעביר קובץ שהושלם ל-original/ ומוחק את המטא-דאטה. מחזיר את הנתיב החדש."""
+    original = os.path.join(_dir(ORIGINAL), token + ALLOWED_TYPES[content_type])
+    os.replace(_part_path(token), original)
+    os.remove(_meta_path(token))
+    return original
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  עיבוד תמונה (רץ בתהליך נפרד)
+# ─────────────────────────────────────────────────────────────────────────────
+def _save_jpeg(img, max_side: int, dst: str) -> None:
+    copy = img.copy()
+    copy.thumbnail((max_side, max_side))
+    tmp = dst + ".tmp"
+    # exif=b"" – בלי מיקום GPS / דגם מכשיר; הסיבוב כבר הוחל ע"י exif_transpose
+    copy.save(tmp, "JPEG", quality=85, optimize=True, progressive=True, exif=b"")
+    os.replace(tmp, dst)
+
+
+def process_image(src: str, token: str) -> None:
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        _save_jpeg(img, WEB_MAX_SIDE, os.path.join(PHOTOS_DIR, media_path(WEB, token)))
+        _save_jpeg(img, THUMB_MAX_SIDE, os.path.join(PHOTOS_DIR, media_path(THUMB, token)))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Process pool + תור חסום
+#  ה-pool נוצר בפעם הראשונה שצריך אותו – אחרי ה-fork של gunicorn, לא בתהליך הראשי.
+#  spawn ולא fork: worker של uvicorn מריץ threads, ו-fork מתהליך עם threads עלול להיתקע.
+# ─────────────────────────────────────────────────────────────────────────────
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _marker_mtime(entry: os.DirEntry) -> Optional[float]:
+    # _release_slot מוחק סימונים בלי הנעילה (מה-callback של ה-pool, בכל worker),
+    # כך שסימון יכול להיעלם בין scandir ל-stat – אז הוא פשוט כבר לא בתור
+    try:
+        return entry.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def pending_jobs() -> int:
+    """תמונות שממתינות לעיבוד בכל ה-workers (סימונים ב-queued/ שעוד לא התיישנו)."""
+    cutoff = time.time() - JOB_TIMEOUT
+    return sum(
+        1 for e in os.scandir(_dir(QUEUED))
+        if (mtime := _marker_mtime(e)) is not None and mtime >= cutoff
+    )
+
+
+def _reserve_slot(token: str) -> bool:
+    with _global_lock():
+        if pending_jobs() >= MAX_PENDING:
+            return False
+        open(_queued_path(token), "w").close()
+    return True
+
+
+def _release_slot(token: str) -> None:
+    try:
+        os.remove(_queued_path(token))
+    except FileNotFoundError:
+        pass
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _dir(WEB)
+            _dir(THUMB)
+            _pool = ProcessPoolExecutor(
+                max_workers=PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def submit(src: str, token: str, on_done: Callable[[str, bool], None]) -> None:
+    """
+    שולח תמונה לעיבוד (המקום בתור כבר נתפס ב-ChunkWriter.reserve).
+    on_done(token, ok) נקרא כשהעיבוד הסתיים (ב-thread של ה-pool).
+    """
+
+    def _done(fut: Future) -> None:
+        _release_slot(token)
+        error = fut.exception()
+        if error is not None:
+            print(f"Photo processing failed ({token}): {error}")
+        on_done(token, error is None)
+
+    _get_pool().submit(process_image, src, token).add_done_callback(_done)
+
+
+def shutdown() -> None:
+    """ממתין לעבודות שבתור (נקרא ב-shutdown של ה-worker)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
@@ -1,6 +1,7 @@
 # backend/schemas.py
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
 
 
 class SeatOut(BaseModel):
@@ -10,11 +11,35 @@ class SeatOut(BaseModel):
     area: Optional[str]
     status: str
     owner_id: Optional[int]
+    held: bool = False  # אדמין אחר באמצע שיבוץ לכיסא הזה
+    hold_expires_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
 
+# גבולות סבירים לאולם – מונעים INSERT של מאות אלפי כיסאות בטעות
+MAX_TABLES_PER_AREA = 200
+MAX_TABLE_CAPACITY  = 40
+
+
+class LayoutAreaIn(BaseModel):
+    area: str
+    tables: int = Field(ge=1, le=MAX_TABLES_PER_AREA)
+    capacity: int = Field(12, ge=1, le=MAX_TABLE_CAPACITY)
+
+
+class LayoutIn(BaseModel):
+    template: Optional[str] = None  # שם תבנית מוכנה (layout.LAYOUT_TEMPLATES)
+    areas: Optional[List[LayoutAreaIn]] = Field(None, max_length=20)  # או תבנית מותאמת
+
+
+class TableResizeIn(BaseModel):
+    area: str
+    col: int
+    capacity: int = Field(ge=1, le=MAX_TABLE_CAPACITY)
+
+
 class UserBase(BaseModel):
     name: str
     phone: str
@@ -42,6 +67,18 @@ class UserOut(UserBase):
         from_attributes = True
 
 
+class GuestBootstrapIn(UserBase):
+    create: bool = True  # False – רק כניסה של אורח קיים, 404 אם הטלפון לא מוכר
+
+
+class GuestBootstrapOut(BaseModel):
+    user: UserOut
+    seats: List[SeatOut]
+    areas: List[str]
+    blessings: List[dict]
+    blessings_loaded: bool  # False אם הקריאה האחרונה מגוגל נכשלה / עוד לא הסתיימה – הלקוח יכול לטעון את /blessing בנפרד
+
+
 class ComingIn(BaseModel):
     coming: bool
 
@@ -59,4 +96,30 @@ class SingleIn(BaseModel):
 
 class FeedbackIn(BaseModel):
     name: str
-    feedback: str
\ No newline at end of file
+    feedback: str
+
+
+class PhotoUploadIn(BaseModel):
+    size: int
+    content_type: str
+    uploader: Optional[str] = None
+
+
+class PhotoOut(BaseModel):
+    id: int
+    uploader: Optional[str]
+    thumb_url: str
+    web_url: str
+
+
+class PhotoFeedOut(BaseModel):
+    photos: List[PhotoOut]
+    next_cursor: Optional[int]  # id להעביר ב-?before= לעמוד הבא, None בסוף
+
+
+
+class SeatHoldIn(BaseModel):
+    # רשימה ריקה הייתה משחררת את כל ההחזקה הקיימת ועדיין "מצליחה"
+    seat_ids: List[int] = Field(..., min_length=1)
+    user_id: int
+    hold_id: Optional[str] = None  # להחליף החזקה קיימת (בחירת שולחן אחר)
@@ -1,5 +1,9 @@
 # backend/sheets_repo.py
 
+import os
+import threading
+import time
+
 from backend.google_sheets import open_sheet
 
 # נסיון לפתוח את הגיליון "wedding" פעם אחת בלבד
@@ -11,6 +15,37 @@ try:
 except Exception as e:
 	raise RuntimeError(f"❗ שגיאה בחיבור ל-Google Sheets: {e}")
 
+
+# ---- חיבור / בריאות ----
+_READY_TTL = 30  # שניות – בדיקת readiness לא תפנה לגוגל בכל קריאה
+_ready_state = {"checked_at": 0.0, "ok": False}
+
+
+def reset_connections():
+	"""
+	סוגר את חיבורי ה-HTTP הפתוחים של הלקוח (אחרי fork של worker).
+	החיבורים נפתחים מחדש אוטומטית בבקשה הבאה.
+	"""
+	# gspread 6: Spreadsheet.client הוא ה-HTTPClient עצמו, וה-session שלו מחזיק את ה-keep-alive
+	_SPREAD.client.session.close()
+
+
+def is_ready() -> bool:
+	"""
+	בדיקה זולה שהגיליון נגיש (מטא-דאטה בלבד), עם cache של _READY_TTL שניות.
+	"""
+	now = time.monotonic()
+	if now - _ready_state["checked_at"] < _READY_TTL:
+		return _ready_state["ok"]
+	try:
+		_SPREAD.fetch_sheet_metadata({"fields": "spreadsheetId"})
+		ok = True
+	except Exception as e:
+		print(f"Google Sheets readiness check failed: {e}")
+		ok = False
+	_ready_state.update(checked_at=now, ok=ok)
+	return ok
+
 # ---- ברכות ----
 def add_blessing(name: str, text: str):
 	"""
@@ -19,34 +54,88 @@ def add_blessing(name: str, text: str):
 	blessing_ws.append_row([name, text])
 
 
+def _fetch_blessings():
+	"""
+	קורא את כל הברכות מגוגל (החדשות ראשונות). שגיאה מגוגל עולה למעלה.
+	"""
+	# get_all_records קורא את כל השורות כשהשורה הראשונה משמשת כמפתחות (Headers)
+	records = blessing_ws.get_all_records()
+
+	formatted_blessings = []
+	for row in records:
+		# מנסה לשלוף לפי כותרות אפשריות (במידה וקראת לעמודות "שם" ו-"ברכה" או באנגלית)
+		name = row.get("שם", row.get("name", row.get("Name", "")))
+		blessing_text = row.get("ברכה", row.get("text", row.get("blessing", "")))
+
+		# נוסיף רק אם יש באמת תוכן
+		if name or blessing_text:
+			formatted_blessings.append({
+				"name": str(name),
+				"blessing": str(blessing_text)
+			})
+
+	# מחזירים את הרשימה הפוך, כדי שהברכות החדשות ביותר יופיעו ראשונות
+	return formatted_blessings[::-1]
+
+
 def get_blessings():
 	"""
-	שולף את כל הברכות מהגיליון 'ברכות'.
+	שולף את כל הברכות מהגיליון 'ברכות'. בשגיאה – רשימה ריקה.
 	"""
 	try:
-		# get_all_records קורא את כל השורות כשהשורה הראשונה משמשת כמפתחות (Headers)
-		records = blessing_ws.get_all_records()
-
-		formatted_blessings = []
-		for row in records:
-			# מנסה לשלוף לפי כותרות אפשריות (במידה וקראת לעמודות "שם" ו-"ברכה" או באנגלית)
-			name = row.get("שם", row.get("name", row.get("Name", "")))
-			blessing_text = row.get("ברכה", row.get("text", row.get("blessing", "")))
-
-			# נוסיף רק אם יש באמת תוכן
-			if name or blessing_text:
-				formatted_blessings.append({
-					"name": str(name),
-					"blessing": str(blessing_text)
-				})
-
-		# מחזירים את הרשימה הפוך, כדי שהברכות החדשות ביותר יופיעו ראשונות
-		return formatted_blessings[::-1]
+		return _fetch_blessings()
 	except Exception as e:
 		print(f"Error getting blessings: {e}")
 		return []
 
 
+# ---- cache לברכות (ל-bootstrap של האורח) ----
+# הבקשה לא מחכה לגוגל: מחזירים את מה שיש ב-cache, ואם הוא ישן – מפעילים רענון אחד ברקע.
+# ל-gspread אין timeout, לכן לעולם לא רץ יותר מרענון אחד; רענון שנתקע יותר
+# מ-_BLESSINGS_STUCK שניות לא חוסם רענון חדש (לכל היותר thread תקוע אחד לכל פרק זמן כזה).
+BLESSINGS_CACHE_TTL = float(os.getenv("BLESSINGS_CACHE_TTL", "30"))  # שניות
+_BLESSINGS_STUCK = 60
+_blessings_lock = threading.Lock()
+_blessings_state = {
+	"rows": [],           # הקריאה המוצלחת האחרונה
+	"ok": False,          # האם הקריאה האחרונה הצליחה
+	"fetched_at": None,   # monotonic של הקריאה האחרונה (הצלחה או כישלון)
+	"refresh_started": None,
+}
+
+
+def _refresh_blessings():
+	try:
+		rows, ok = _fetch_blessings(), True
+	except Exception as e:
+		print(f"Error refreshing blessings cache: {e}")
+		rows, ok = None, False
+	with _blessings_lock:
+		if ok:
+			_blessings_state["rows"] = rows
+		_blessings_state.update(ok=ok, fetched_at=time.monotonic(), refresh_started=None)
+
+
+def cached_blessings():
+	"""
+	מחזיר (ברכות, loaded) מה-cache, בלי לחכות לגוגל.
+	loaded=False אם עוד אין קריאה מוצלחת או שהקריאה האחרונה נכשלה –
+	אז הברכות הן מהקריאה המוצלחת הקודמת (או רשימה ריקה).
+	"""
+	now = time.monotonic()
+	with _blessings_lock:
+		fetched_at = _blessings_state["fetched_at"]
+		started = _blessings_state["refresh_started"]
+		stale = fetched_at is None or now - fetched_at >= BLESSINGS_CACHE_TTL
+		start = stale and (started is None or now - started >= _BLESSINGS_STUCK)
+		if start:
+			_blessings_state["refresh_started"] = now
+		rows, ok = _blessings_state["rows"], _blessings_state["ok"]
+	if start:
+		threading.Thread(target=_refresh_blessings, name="sheets-blessings", daemon=True).start()
+	return rows, ok
+
+
 # ---- רווקים ורווקות ----
 def list_singles():
 	records = singles_ws.get_all_records()
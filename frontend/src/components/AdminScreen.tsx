@@ -65,10 +65,19 @@ interface Seat {
   area: string;
   status: "free" | "taken";
   owner_id: number | null;
+  held?: boolean; // אדמין (אחר, או אנחנו) באמצע שיבוץ לכיסא הזה
 }
 
 type Stage = "details" | "seats" | "confirmed" | null;
 
+// כיסאות שהחזקנו בשולחן שנבחר, עד שהאדמין מאשר או מבטל
+interface PendingHold {
+  holdId:  string;
+  col:     number;
+  seatIds: number[];
+  ttl:     number; // שניות
+}
+
 /* ─────────────────────────────────────────────────────────────
  *  API HELPERS
  * ───────────────────────────────────────────────────────────── */
@@ -123,7 +132,7 @@ const apiCreateUser = (data: Partial<User>): Promise<User> =>
 
 const apiUpdateUser = (
   id: number,
-  data: Partial<User> & { seat_ids?: number[] }
+  data: Partial<User> & { seat_ids?: number[]; hold_id?: string }
 ): Promise<User> =>
   safeFetch(`${BASE}/users/${id}`, {
     method: "PUT",
@@ -131,6 +140,25 @@ const apiUpdateUser = (
     body: JSON.stringify(data),
   });
 
+// החזקה קצרה על הכיסאות לפני השיבוץ – התנגשות עם אדמין אחר מתגלה כאן (409).
+// עם hold_id קיים: מעביר את ההחזקה לכיסאות החדשים / מחדש אותה ל-ttl נוסף.
+const apiPlaceHold = (
+  seat_ids: number[],
+  user_id: number,
+  hold_id?: string
+): Promise<{ ok: boolean; hold_id: string; ttl: number }> =>
+  safeFetch(`${BASE}/seats/hold`, {
+    method: "POST",
+    headers: adminHeaders(),
+    body: JSON.stringify({ seat_ids, user_id, hold_id }),
+  });
+
+const apiReleaseHold = (hold_id: string): Promise<{ ok: boolean }> =>
+  safeFetch(`${BASE}/seats/hold/${hold_id}`, {
+    method: "DELETE",
+    headers: adminHeaders(),
+  });
+
 const apiCreateTable = (
   area: string,
   capacity = 12
@@ -144,7 +172,7 @@ const apiCreateTable = (
 const apiDeleteTable = (
   area: string,
   col: number
-): Promise<{ ok: boolean }> =>
+): Promise<{ ok: boolean; released_user_ids: number[] }> =>
   safeFetch(
     `${BASE}/seats/table?area=${encodeURIComponent(area)}&col=${col}`,
     { method: "DELETE", headers: adminHeaders() }
@@ -226,6 +254,21 @@ const AdminScreen: React.FC = () => {
   const [areaIn,    setAreaIn]    = useState("");
   const [comingIn,  setComingIn]  = useState<"כן" | "לא" | null>(null);
 
+  /* ── Seat Hold ───────────────────────────────────────────── *
+   *  בחירת שולחן → החזקה על הכיסאות (POST /seats/hold).
+   *  אישור → PUT /users/{id} עם אותו hold_id.
+   *  חזרה / ביטול / מעבר שלב / סגירה → שחרור ההחזקה.
+   *  ref כדי שה-cleanup של ה-effect יראה תמיד את ההחזקה העדכנית.
+   * ──────────────────────────────────────────────────────────── */
+  const [hold,      setHoldState] = useState<PendingHold | null>(null);
+  const [holdBusy,  setHoldBusy]  = useState(false);
+  const holdRef = useRef<PendingHold | null>(null);
+
+  const setHold = useCallback((h: PendingHold | null) => {
+    holdRef.current = h;
+    setHoldState(h);
+  }, []);
+
   /* ── Create Form ─────────────────────────────────────────── */
   const [showCreate, setShowCreate] = useState(false);
   const [newName,    setNewName]    = useState("");
@@ -256,6 +299,14 @@ const AdminScreen: React.FC = () => {
     [seats]
   );
 
+  // כיסא פנוי עבור האורח הנבחר: לא של אורח אחר, ולא מוחזק – אלא אם ההחזקה שלנו
+  const isFreeFor = useCallback(
+    (s: Seat, userId: number | undefined) =>
+      (!s.owner_id || s.owner_id === userId) &&
+      (!s.held || !!hold?.seatIds.includes(s.id)),
+    [hold]
+  );
+
   // Set של ה-IDs שתואמים לחיפוש הנוכחי (לצורך הדגשה בשולחנות)
   const matchedUserIds = useMemo(
     () => new Set(displayUsers.map((u) => u.id)),
@@ -300,6 +351,45 @@ const AdminScreen: React.FC = () => {
     return () => clearInterval(id);
   }, [refreshData]);
 
+  /* ── Seat Hold: Release + Renew ──────────────────────────── */
+  const releaseHold = useCallback(() => {
+    const h = holdRef.current;
+    if (!h) return;
+    setHold(null);
+    apiReleaseHold(h.holdId)
+      .catch(() => {})
+      .finally(() => fetchSeats().then(setSeats).catch(() => {}));
+  }, [setHold]);
+
+  // יציאה משלב השיבוץ (חזרה / סגירה / אורח אחר) → שחרור.
+  // גם החזקה שחזרה מהשרת אחרי שכבר יצאנו מהשלב משתחררת כאן.
+  useEffect(() => {
+    if (hold && stage !== "seats") releaseHold();
+  }, [hold, stage, releaseHold]);
+
+  // unmount – שחרור; סגירת הטאב – השרת משחרר לבד אחרי ttl
+  useEffect(() => () => {
+    const h = holdRef.current;
+    if (h) apiReleaseHold(h.holdId).catch(() => {});
+  }, []);
+
+  // חידוש לפני שה-ttl נגמר, כל עוד האדמין עדיין מתלבט
+  useEffect(() => {
+    if (!hold || !selected || stage !== "seats") return;
+    const userId = selected.id;
+    const id = setInterval(async () => {
+      try {
+        await apiPlaceHold(hold.seatIds, userId, hold.holdId);
+      } catch (e) {
+        if (holdRef.current?.holdId !== hold.holdId) return;
+        setHold(null);
+        toast({ title: "ההחזקה על הכיסאות פגה", description: (e as Error).message, status: "warning", duration: 4000 });
+        fetchSeats().then(setSeats).catch(() => {});
+      }
+    }, (hold.ttl * 1000) / 2);
+    return () => clearInterval(id);
+  }, [hold, selected, stage, setHold, toast]);
+
   /* ── Search: Debounce + AbortController ──────────────────── */
 
   // כשאין חיפוש, displayUsers מסונכרן עם allUsers
@@ -446,12 +536,12 @@ const AdminScreen: React.FC = () => {
     }
   };
 
-  /* ── Assign to Table ─────────────────────────────────────── */
-  const assignToTable = async (col: number) => {
+  /* ── Pick Table (hold) ───────────────────────────────────── */
+  const pickTable = async (col: number) => {
     if (!selected) return;
 
     const tableSeats = seats.filter((s) => s.area === areaIn && s.col === col);
-    const available  = tableSeats.filter((s) => !s.owner_id || s.owner_id === selected.id);
+    const available  = tableSeats.filter((s) => isFreeFor(s, selected.id));
 
     if (available.length < numGuests) {
       toast({ title: "אין מספיק מקומות פנויים בשולחן זה", status: "error", duration: 3000 });
@@ -459,21 +549,49 @@ const AdminScreen: React.FC = () => {
       return;
     }
 
-    const payload = {
-      seat_ids:    available.slice(0, numGuests).map((s) => s.id),
-      num_guests:  numGuests,
-      reserve_count: 0,
-      area:        areaIn,
-      is_coming:   comingIn,
-    };
+    const seatIds = available.slice(0, numGuests).map((s) => s.id);
+
+    setHoldBusy(true);
+    try {
+      // החלפת שולחן: אותו hold_id – השרת משחרר את הכיסאות הקודמים באותה טרנזקציה
+      const res = await apiPlaceHold(seatIds, selected.id, holdRef.current?.holdId);
+      setHold({ holdId: res.hold_id, col, seatIds, ttl: res.ttl });
+    } catch (e) {
+      toast({
+        title: "השולחן נתפס",
+        description: (e as Error).message,
+        status: "error",
+        duration: 5000,
+        isClosable: true,
+      });
+    } finally {
+      setHoldBusy(false);
+      setSeats(await fetchSeats().catch(() => seats));
+    }
+  };
+
+  /* ── Confirm Assignment ──────────────────────────────────── */
+  const confirmAssign = async () => {
+    const h = holdRef.current;
+    if (!selected || !h) return;
 
+    setHoldBusy(true);
     try {
-      const updated = await apiUpdateUser(selected.id, payload);
+      const updated = await apiUpdateUser(selected.id, {
+        seat_ids:      h.seatIds,
+        hold_id:       h.holdId,
+        num_guests:    numGuests,
+        reserve_count: 0,
+        area:          areaIn,
+        is_coming:     comingIn,
+      });
+      // השרת כבר שחרר את ההחזקה כחלק מהשיבוץ
+      setHold(null);
       syncUpdatedUser(updated);
       setSelected(updated);
       setSeats(await fetchSeats());
       setStage("confirmed");
-      toast({ title: `שובץ לשולחן ${getTableDisplay(areaIn, col)}`, status: "success", duration: 2500 });
+      toast({ title: `שובץ לשולחן ${getTableDisplay(areaIn, h.col)}`, status: "success", duration: 2500 });
     } catch (e) {
       toast({
         title: "שיבוץ נכשל",
@@ -482,7 +600,9 @@ const AdminScreen: React.FC = () => {
         duration: 5000,
         isClosable: true,
       });
-      setSeats(await fetchSeats().catch(() => seats));
+      releaseHold();
+    } finally {
+      setHoldBusy(false);
     }
   };
 
@@ -508,10 +628,18 @@ const AdminScreen: React.FC = () => {
     if (!window.confirm(`למחוק את שולחן ${displayName} באזור ${area}? כל האורחים יחזרו לרזרבה.`)) return;
 
     try {
-      await apiDeleteTable(area, col);
+      const { released_user_ids } = await apiDeleteTable(area, col);
       const freshSeats = await fetchSeats();
       setSeats(freshSeats);
-      toast({ title: "השולחן נמחק", status: "success", duration: 2500 });
+      // האורחים שישבו בשולחן חזרו לרזרבה – צריך לשבץ אותם מחדש
+      const released = released_user_ids.map((id) => userById.get(id)?.name ?? `#${id}`);
+      toast({
+        title: "השולחן נמחק",
+        description: released.length ? `חזרו לרזרבה: ${released.join(", ")}` : undefined,
+        status: released.length ? "warning" : "success",
+        duration: released.length ? 8000 : 2500,
+        isClosable: true,
+      });
       // אם המשתמש הנבחר ישב בשולחן שנמחק
       if (selected && seats.some((s) => s.owner_id === selected.id && s.area === area && s.col === col)) {
         setStage("details");
@@ -534,7 +662,7 @@ const AdminScreen: React.FC = () => {
 
     return Array.from(map.entries())
       .map(([col, colSeats]) => {
-        const freeCount     = colSeats.filter((s) => !s.owner_id || s.owner_id === selected?.id).length;
+        const freeCount     = colSeats.filter((s) => isFreeFor(s, selected?.id)).length;
         const occupantIds   = Array.from(
           new Set(colSeats.filter((s) => s.owner_id && s.owner_id !== selected?.id).map((s) => s.owner_id!))
         );
@@ -545,7 +673,7 @@ const AdminScreen: React.FC = () => {
         return { col, freeCount, occupants, totalCapacity: colSeats.length, isCurrentUser };
       })
       .sort((a, b) => a.col - b.col);
-  }, [areaIn, seats, selected, userById]);
+  }, [areaIn, seats, selected, userById, isFreeFor]);
 
   /* ─────────────────────────────────────────────────────────────
    *  STATISTICS  (תמיד מבוססות על allUsers + seats המלאים)
@@ -762,18 +890,20 @@ const AdminScreen: React.FC = () => {
                     {tables.map((t) => {
                       const hasSpace  = t.freeCount >= numGuests;
                       const isCurrent = t.isCurrentUser;
+                      const isHeld    = hold?.col === t.col;
 
                       return (
                         <Box
                           key={t.col}
                           p={4} borderWidth="2px" borderRadius="md" shadow="sm"
-                          borderColor={isCurrent ? "blue.400" : hasSpace ? "green.300" : "gray.200"}
+                          borderColor={isHeld ? "orange.400" : isCurrent ? "blue.400" : hasSpace ? "green.300" : "gray.200"}
                           bg={hasSpace ? "white" : "gray.50"}
                         >
                           <HStack justify="space-between" mb={2}>
                             <Heading size="sm">
                               שולחן {getTableDisplay(areaIn, t.col)}
                               {isCurrent && <Badge colorScheme="blue" mr={2} fontSize="xs">כאן</Badge>}
+                              {isHeld && <Badge colorScheme="orange" mr={2} fontSize="xs">מוחזק</Badge>}
                             </Heading>
                             <Badge colorScheme={hasSpace ? "green" : "red"}>
                               {t.freeCount}/{t.totalCapacity} פנויים
@@ -794,10 +924,12 @@ const AdminScreen: React.FC = () => {
                           <Button
                             w="full" size="sm"
                             colorScheme={isCurrent ? "blue" : "brand"}
-                            isDisabled={!hasSpace}
-                            onClick={() => assignToTable(t.col)}
+                            isDisabled={!hasSpace || isHeld || holdBusy}
+                            onClick={() => pickTable(t.col)}
                           >
-                            {isCurrent
+                            {isHeld
+                              ? "נבחר – ממתין לאישור"
+                              : isCurrent
                               ? "עדכן שיבוץ"
                               : hasSpace
                               ? "שבץ כאן"
@@ -810,6 +942,22 @@ const AdminScreen: React.FC = () => {
                 );
               })()}
 
+              {hold && (
+                <HStack bg="orange.50" p={3} borderRadius="md" justify="space-between" wrap="wrap">
+                  <Text>
+                    {hold.seatIds.length} מקומות מוחזקים בשולחן {getTableDisplay(areaIn, hold.col)}
+                  </Text>
+                  <HStack gap={2}>
+                    <Button colorScheme="green" size="sm" isLoading={holdBusy} onClick={confirmAssign}>
+                      אשר שיבוץ
+                    </Button>
+                    <Button variant="outline" size="sm" isDisabled={holdBusy} onClick={releaseHold}>
+                      בטל
+                    </Button>
+                  </HStack>
+                </HStack>
+              )}
+
               <Button variant="outline" size="sm" alignSelf="flex-start" onClick={() => setStage("details")}>
                 ‹ חזור לפרטים
               </Button>
@@ -102,6 +102,15 @@ interface Seat {
 }
 type Coming = "כן" | "לא" | null;
 
+// תשובת POST /guest/bootstrap – כל נתוני הכניסה בבקשה אחת
+interface GuestBootstrap {
+  user: User;
+  seats: Seat[];
+  areas: string[];
+  blessings: { name: string; blessing: string }[];
+  blessings_loaded: boolean;
+}
+
 /* ------------------------------------------------------------
  * MASKING HELPER
  * ---------------------------------------------------------- */
@@ -128,20 +137,37 @@ async function safeFetch<T>(url: string, init?: RequestInit): Promise<T> {
   return r.json();
 }
 
-const checkPhone = (phone: string) =>
-  safeFetch<{ exists: boolean }>(`${BASE}/users/check-phone?phone=${encodeURIComponent(phone)}`);
 const guestSearch = (q: string) =>
   safeFetch<User[]>(`${BASE}/users/guest-search?q=${encodeURIComponent(q)}`);
 const seatsByUser = (id: number) =>
   safeFetch<Seat[]>(`${BASE}/seats/user/${id}`);
 const fetchGuestAreas = () =>
   safeFetch<string[]>(`${BASE}/users/guest-areas`);
-const loginOrCreate = (name: string, phone: string) =>
-  safeFetch<User>(`${BASE}/users/login`, {
+// create=false – כניסה של אורח קיים בלבד; null אם הטלפון לא מוכר (404)
+async function guestBootstrap(name: string, phone: string, create = true): Promise<GuestBootstrap | null> {
+  const r = await fetch(`${BASE}/guest/bootstrap`, {
     method: "POST",
     headers: json,
-    body: JSON.stringify({ name, phone }),
+    body: JSON.stringify({ name, phone, create }),
   });
+  if (r.status === 404 && !create) return null;
+  if (!r.ok)
+    throw new Error(
+      (await r.json().catch(() => null))?.detail ?? r.statusText
+    );
+  return r.json();
+}
+
+// מספר שולחן לתצוגה: קידומת לפי מיקום האזור ברשימה הממוינת (10, 11, ...) + col
+const tableLabels = (seats: Seat[], areas: string[]) => {
+  const sortedAreas = Array.from(new Set([...areas, ...seats.map((s) => s.area)]))
+    .filter(Boolean)
+    .sort();
+  return Array.from(new Set(seats.map((s) => {
+    const idx = sortedAreas.indexOf(s.area);
+    return idx >= 0 ? `${idx + 10}${s.col}` : `${s.col}`;
+  })));
+};
 const updateComing = (id: number, coming: boolean) =>
   safeFetch(`${BASE}/users/${id}/coming`, {
     method: "PUT",
@@ -179,6 +205,10 @@ const RSVPScreen: React.FC = () => {
   const [name, setName] = useState("");
   const [phone, setPhone] = useState("");
   const [user, setUser] = useState<User | null>(null);
+  // רשימת האזורים נטענת פעם אחת (מה-bootstrap או מהחיפוש הראשון)
+  const [areas, setAreas] = useState<string[] | null>(null);
+  // הכיסאות של האורח המחובר (מה-bootstrap)
+  const [mySeats, setMySeats] = useState<Seat[]>([]);
 
   const [coming, setComing] = useState<Coming>(null);
   const [guests, setGuests] = useState(1);
@@ -210,8 +240,9 @@ const RSVPScreen: React.FC = () => {
     try {
       const [guestsData, fetchedAreas] = await Promise.all([
         guestSearch(query.trim()),
-        fetchGuestAreas()
+        areas ?? fetchGuestAreas()
       ]);
+      setAreas(fetchedAreas);
 
       const guestsWithSeats = await Promise.all(guestsData.map(async (g) => {
          const st = await seatsByUser(g.id);
@@ -261,6 +292,12 @@ const RSVPScreen: React.FC = () => {
   };
 
   /* ---------- LOGIN ---------- */
+  const applyBootstrap = (b: GuestBootstrap) => {
+    setUser(b.user);
+    setAreas(b.areas);
+    setMySeats(b.seats);
+  };
+
   const handleLogin = async () => {
     const trimmedPhone = phone.trim();
     const trimmedName = name.trim();
@@ -271,11 +308,11 @@ const RSVPScreen: React.FC = () => {
     }
 
     try {
-      const { exists: userExists } = await checkPhone(trimmedPhone);
+      // בקשה אחת: אורח קיים נכנס מיד; טלפון לא מוכר → אישור לפני יצירה
+      const b = await guestBootstrap(trimmedName, trimmedPhone, false);
 
-      if (userExists) {
-        const u = await loginOrCreate(trimmedName, trimmedPhone);
-        setUser(u);
+      if (b) {
+        applyBootstrap(b);
         setShowLogin(false);
       } else {
         setShowCreateConfirm(true);
@@ -291,8 +328,7 @@ const RSVPScreen: React.FC = () => {
 
   const handleCreateConfirmed = async () => {
     try {
-      const u = await loginOrCreate(name.trim(), phone.trim());
-      setUser(u);
+      applyBootstrap((await guestBootstrap(name.trim(), phone.trim()))!);
       setShowLogin(false);
       setShowCreateConfirm(false);
     } catch (e) {
@@ -495,6 +531,11 @@ const RSVPScreen: React.FC = () => {
           <Heading size="lg" color="primary">
             היי {user.name}!
           </Heading>
+          {mySeats.length > 0 && (
+            <Text>
+              השולחן שלכם: <b>{tableLabels(mySeats, areas ?? []).join(", ")}</b>
+            </Text>
+          )}
 
           {/* choice */}
           {!coming && (
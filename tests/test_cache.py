@@ -0,0 +1,100 @@
+# tests/test_cache.py
+#
+# ביטול ה-cache דרך אירועי ה-Session: הדור עולה רק ב-commit, ורק כששורה באמת השתנתה.
+
+import pytest
+
+from backend import cache
+
+
+@pytest.fixture
+def seat(db):
+    from backend.db import Seat
+
+    seat = Seat(area="Hall", col=1, row=1, status="free")
+    db.add(seat)
+    db.commit()
+    return seat
+
+
+def test_orm_change_bumps_after_commit_only(db, seat):
+    before = cache.generation("seats")
+
+    seat.status = "taken"
+    db.flush()
+    assert cache.generation("seats") == before  # עוד לא commit
+
+    db.commit()
+    assert cache.generation("seats") == before + 1
+
+
+def test_bulk_update_bumps_through_do_orm_execute(db, seat):
+    from backend.db import Seat
+
+    users_before, seats_before = cache.generation("users"), cache.generation("seats")
+    changed = db.query(Seat).filter(Seat.id == seat.id).update(
+        {"status": "taken"}, synchronize_session=False
+    )
+    db.commit()
+
+    # query.update עדיין מקבל את ה-rowcount דרך התוצאה שה-listener מחזיר
+    assert changed == 1
+    assert cache.generation("seats") == seats_before + 1
+    assert cache.generation("users") == users_before
+
+
+def test_rollback_does_not_bump(db, seat):
+    from backend.db import Seat
+
+    before = cache.generation("seats")
+    db.query(Seat).filter(Seat.id == seat.id).update(
+        {"status": "taken"}, synchronize_session=False
+    )
+    db.rollback()
+
+    db.commit()  # commit ריק אחרי rollback – מה שנאסף כבר נזרק
+    assert cache.generation("seats") == before
+
+
+def test_update_matching_no_rows_does_not_bump(db, seat):
+    from backend.db import Seat
+
+    before = cache.generation("seats")
+    changed = db.query(Seat).filter(Seat.id == seat.id + 1000).update(
+        {"status": "taken"}, synchronize_session=False
+    )
+    db.commit()
+
+    assert changed == 0
+    assert cache.generation("seats") == before
+
+
+def test_cached_read_sees_committed_change(db, seat):
+    from backend import crud
+
+    user = crud.create_user(db, {"name": "a", "phone": "0500000001"})
+    assert crud.seats_of_user(db, user.id) == []
+    assert crud.seats_of_user(db, user.id) == []  # hit
+
+    crud.assign_seats(db, [seat.id], user.id)
+
+    assert [s["id"] for s in crud.seats_of_user(db, user.id)] == [seat.id]
+
+
+def test_lru_evicts_oldest_at_maxsize(db):
+    calls = []
+
+    @cache.cached("users", maxsize=2)
+    def read(db, key):
+        calls.append(key)
+        return key
+
+    read(db, 1)
+    read(db, 2)
+    read(db, 1)   # 1 הופך לאחרון שבשימוש
+    read(db, 3)   # מפנה את 2
+
+    read(db, 1)
+    read(db, 2)
+    assert calls == [1, 2, 3, 2]
+    assert len(read.cache.data) == 2
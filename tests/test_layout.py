@@ -0,0 +1,126 @@
+# tests/test_layout.py
+
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def layout(engine):
+    from backend import layout
+    return layout
+
+
+def _tables(db, area: str) -> dict:
+    """{col: [rows]} של האזור."""
+    from backend.db import Seat
+
+    db.expire_all()
+    result: dict = {}
+    for s in db.query(Seat).filter(Seat.area == area).order_by(Seat.col, Seat.row):
+        result.setdefault(s.col, []).append(s.row)
+    return result
+
+
+def _seat_owner(db, area: str, col: int, row: int, user_id: int) -> None:
+    from backend.db import Seat
+
+    db.query(Seat).filter(Seat.area == area, Seat.col == col, Seat.row == row).update(
+        {"owner_id": user_id, "status": "taken"}, synchronize_session=False
+    )
+    db.commit()
+
+
+@pytest.fixture
+def guests(db):
+    from backend import crud
+
+    return [crud.create_user(db, {"name": f"g{i}", "phone": f"050000000{i}"}).id for i in range(3)]
+
+
+def test_provision_numbers_tables_after_existing_ones(db, layout):
+    layout.provision_layout(db, [{"area": "Hall", "tables": 2, "capacity": 3}])
+
+    created = layout.provision_layout(db, [
+        {"area": "Hall",   "tables": 2, "capacity": 2},
+        {"area": "Garden", "tables": 1, "capacity": 4},
+    ])
+
+    assert created == {"Garden": [1], "Hall": [3, 4]}
+    assert _tables(db, "Hall") == {1: [1, 2, 3], 2: [1, 2, 3], 3: [1, 2], 4: [1, 2]}
+    assert _tables(db, "Garden") == {1: [1, 2, 3, 4]}
+
+
+def test_provision_is_all_or_nothing(db, layout):
+    with pytest.raises(ValueError):
+        layout.provision_layout(db, [
+            {"area": "A", "tables": 2, "capacity": 3},
+            {"area": "B", "tables": 1, "capacity": 0},
+        ])
+    assert _tables(db, "A") == {}
+
+
+def test_concurrent_add_tables_get_distinct_cols(db, layout):
+    from backend.db import SessionLocal
+
+    layout.add_tables(db, "Hall", 1, 2)        # מחזיק את נעילת האזור עד commit
+    other: dict = {}
+
+    def add_in_other_session():
+        session = SessionLocal()
+        try:
+            other["cols"] = layout.add_tables(session, "Hall", 1, 2)
+            session.commit()
+        finally:
+            session.close()
+
+    t = threading.Thread(target=add_in_other_session)
+    t.start()
+    t.join(0.3)
+    assert t.is_alive()                         # ממתין לנעילה, לא מחשב max(col) ישן
+    db.commit()
+    t.join(5)
+
+    assert other["cols"] == [2]
+    assert sorted(_tables(db, "Hall")) == [1, 2]
+
+
+def test_resize_grows_table_in_place(db, layout, guests):
+    layout.add_tables(db, "Hall", 1, 2)
+    db.commit()
+    _seat_owner(db, "Hall", 1, 1, guests[0])
+
+    assert layout.resize_table(db, "Hall", 1, 4) == []
+
+    assert _tables(db, "Hall") == {1: [1, 2, 3, 4]}
+    from backend.db import Seat
+    assert db.query(Seat).filter(Seat.owner_id == guests[0]).count() == 1
+
+
+def test_resize_shrink_releases_only_removed_seats(db, layout, guests):
+    layout.add_tables(db, "Hall", 1, 4)
+    db.commit()
+    _seat_owner(db, "Hall", 1, 1, guests[0])
+    _seat_owner(db, "Hall", 1, 3, guests[1])
+    _seat_owner(db, "Hall", 1, 4, guests[2])
+
+    released = layout.resize_table(db, "Hall", 1, 2)
+
+    assert released == sorted(guests[1:])
+    assert _tables(db, "Hall") == {1: [1, 2]}
+
+
+def test_resize_missing_table(db, layout):
+    with pytest.raises(LookupError):
+        layout.resize_table(db, "Hall", 7, 4)
+
+
+def test_delete_table_reports_unseated_guests(db, layout, guests):
+    layout.add_tables(db, "Hall", 2, 3)
+    db.commit()
+    _seat_owner(db, "Hall", 1, 1, guests[0])
+    _seat_owner(db, "Hall", 1, 2, guests[0])
+    _seat_owner(db, "Hall", 2, 1, guests[1])
+
+    assert layout.delete_table(db, "Hall", 1) == [guests[0]]
+    assert _tables(db, "Hall") == {2: [1, 2, 3]}
@@ -0,0 +1,84 @@
+# tests/test_migrations.py
+
+import pytest
+import sqlalchemy as sa
+
+
+@pytest.fixture
+def migrations(engine):
+    # import רק אחרי שה-fixture של engine וידא שיש DB (backend.db דורש DATABASE_URL)
+    from backend import migrations
+    return migrations
+
+
+def _seed(conn, users: int = 400, areas: int = 4, tables: int = 30, capacity: int = 12) -> None:
+    conn.execute(
+        sa.text(
+            "INSERT INTO users (name, phone, area, is_coming) "
+            "SELECT 'guest ' || i, lpad(i::text, 10, '0'), 'area ' || (i % :areas), "
+            "CASE WHEN i % 3 = 0 THEN 'לא' ELSE 'כן' END "
+            "FROM generate_series(1, :n) AS i"
+        ),
+        {"n": users, "areas": areas},
+    )
+    conn.execute(
+        sa.text(
+            "INSERT INTO seats (area, col, row, status) "
+            "SELECT 'area ' || a, c, r, 'free' "
+            "FROM generate_series(0, :areas - 1) a, generate_series(1, :tables) c, "
+            "generate_series(1, :capacity) r"
+        ),
+        {"areas": areas, "tables": tables, "capacity": capacity},
+    )
+    conn.execute(
+        sa.text(
+            "UPDATE seats SET owner_id = u.id, status = 'taken' "
+            "FROM users u WHERE seats.id = u.id * 3"
+        )
+    )
+    conn.execute(sa.text("ANALYZE"))
+
+
+def test_hot_queries_use_indexes(engine, migrations):
+    with engine.begin() as conn:
+        _seed(conn)
+
+    results = migrations.check_query_plans()
+
+    assert results == {name: True for name in migrations.HOT_QUERIES}
+
+
+def test_check_query_plans_flags_missing_index(engine, migrations):
+    with engine.begin() as conn:
+        _seed(conn)
+        conn.execute(sa.text("DROP INDEX ix_seats_owner_id"))
+
+    assert migrations.check_query_plans()["seats_by_owner"] is False
+
+
+def test_unique_seat_migration_renumbers_duplicate_tables(engine, migrations, capsys):
+    # מצב של deployment ישן: בלי האינדקס הייחודי, ושני שולחנות שקיבלו אותו col
+    with engine.begin() as conn:
+        conn.execute(sa.text("ALTER TABLE seats DROP CONSTRAINT uq_seats_area_col_row"))
+        conn.execute(sa.text("DELETE FROM schema_migrations WHERE version >= 2"))
+        conn.execute(sa.text("INSERT INTO users (id, name, phone) VALUES (1, 'a', '0500000001')"))
+        conn.execute(
+            sa.text(
+                "INSERT INTO seats (area, col, row, status, owner_id) "
+                "SELECT 'Hall', 1, r, 'free', NULL FROM generate_series(1, 3) r "
+                "UNION ALL SELECT 'Hall', 1, r, 'taken', 1 FROM generate_series(1, 3) r "
+                "UNION ALL SELECT 'Hall', 2, r, 'free', NULL FROM generate_series(1, 3) r"
+            )
+        )
+
+    applied = migrations.upgrade()
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            sa.text("SELECT col, count(*), max(owner_id) FROM seats GROUP BY col ORDER BY col")
+        ).all()
+    assert applied == [2, 3]
+    # השולחן הראשון נשאר ב-col 1, העותק (עם האורח) עבר ל-col 3 – שום כיסא לא נמחק
+    assert [tuple(r) for r in rows] == [(1, 3, None), (2, 3, None), (3, 3, 1)]
+    # ההעברה מדווחת עם האורחים שלה, כדי שהאדמין יוכל לעדכן אותם
+    assert "area 'Hall': duplicate table 1 → 3 (guests: 1)" in capsys.readouterr().out
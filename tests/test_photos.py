@@ -0,0 +1,181 @@
+# tests/test_photos.py
+#
+# הפרוטוקול של ההעלאה והגבלת העומס – בלי DB ובלי process pool (רק מערכת קבצים).
+
+import os
+
+import pytest
+
+from backend import photos
+
+JPEG = "image/jpeg"
+
+
+@pytest.fixture(autouse=True)
+def photos_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(photos, "PHOTOS_DIR", str(tmp_path))
+    monkeypatch.setattr(photos, "_last_sweep", 0.0)
+    return tmp_path
+
+
+def _upload(data: bytes) -> str:
+    token = photos.create_upload(len(data), JPEG, "guest")
+    writer = photos.ChunkWriter(token, 0)
+    try:
+        writer.write(data)
+    finally:
+        writer.close()
+    return token
+
+
+def _complete(token: str, size: int) -> None:
+    """מה שה-PATCH המסיים עושה: תור → (שורה ב-DB) → העברת הקובץ."""
+    writer = photos.ChunkWriter(token, size)
+    try:
+        writer.reserve()
+        writer.finish()
+    finally:
+        writer.close()
+
+
+def test_upload_resumes_from_server_offset():
+    token = photos.create_upload(10, JPEG, "guest")
+    writer = photos.ChunkWriter(token, 0)
+    writer.write(b"12345")
+    writer.close()
+
+    # אחרי ניתוק – הלקוח שואל מה נשמר וממשיך משם
+    assert photos.get_upload(token)["offset"] == 5
+    with pytest.raises(photos.UploadError) as e:
+        photos.ChunkWriter(token, 0)
+    assert (e.value.status_code, e.value.offset) == (409, 5)
+
+    writer = photos.ChunkWriter(token, 5)
+    writer.write(b"67890")
+    assert writer.complete
+    writer.reserve()
+    original = writer.finish()
+    writer.close()
+
+    with open(original, "rb") as f:
+        assert f.read() == b"1234567890"
+    with pytest.raises(photos.UploadError) as e:
+        photos.get_upload(token)
+    assert e.value.status_code == 404
+
+
+def test_concurrent_patch_is_busy():
+    token = photos.create_upload(4, JPEG, None)
+    first = photos.ChunkWriter(token, 0)
+    try:
+        with pytest.raises(photos.UploadError) as e:
+            photos.ChunkWriter(token, 0)
+        assert e.value.status_code == 409
+    finally:
+        first.close()
+
+
+def test_write_past_declared_size_is_rejected():
+    token = photos.create_upload(4, JPEG, None)
+    writer = photos.ChunkWriter(token, 0)
+    writer.write(b"12")
+    with pytest.raises(photos.UploadError) as e:
+        writer.write(b"345")
+    writer.close()
+    assert (e.value.status_code, e.value.offset) == (413, 2)
+    assert photos.get_upload(token)["offset"] == 2
+
+
+def test_writer_on_finished_upload_is_not_found():
+    token = _upload(b"abcd")
+    _complete(token, 4)
+    with pytest.raises(photos.UploadError) as e:
+        photos.ChunkWriter(token, 4)
+    assert e.value.status_code == 404
+
+
+def test_full_queue_rejects_completion_and_keeps_the_upload(monkeypatch):
+    monkeypatch.setattr(photos, "MAX_PENDING", 1)
+    tokens = [_upload(b"x" * 100) for _ in range(3)]
+
+    results = []
+    for token in tokens:
+        try:
+            _complete(token, 100)
+            results.append("queued")
+        except photos.UploadError as e:
+            results.append((e.status_code, e.offset))
+
+    assert results == ["queued", (503, 100), (503, 100)]
+    assert photos.pending_jobs() == 1
+    # הקובץ החלקי נשמר – הלקוח רק שולח שוב PATCH ריק
+    assert photos.get_upload(tokens[1])["offset"] == 100
+
+    # כל עוד התור מלא – גם העלאה חדשה נדחית מראש
+    with pytest.raises(photos.UploadError) as e:
+        photos.create_upload(100, JPEG, None)
+    assert e.value.status_code == 503
+
+    photos._release_slot(tokens[0])  # העיבוד של הראשונה הסתיים
+    _complete(tokens[1], 100)
+    assert photos.pending_jobs() == 1
+
+
+def test_release_returns_the_slot_and_keeps_the_upload(monkeypatch):
+    monkeypatch.setattr(photos, "MAX_PENDING", 1)
+    token = _upload(b"abcd")
+
+    # INSERT נכשל אחרי reserve – כמו ב-_finish_photo
+    writer = photos.ChunkWriter(token, 4)
+    writer.reserve()
+    writer.release()
+    writer.close()
+
+    assert photos.pending_jobs() == 0
+    assert photos.get_upload(token)["offset"] == 4
+    _complete(token, 4)
+
+
+def test_open_uploads_are_capped(monkeypatch):
+    monkeypatch.setattr(photos, "MAX_OPEN_UPLOADS", 2)
+    photos.create_upload(1, JPEG, None)
+    photos.create_upload(1, JPEG, None)
+    with pytest.raises(photos.UploadError) as e:
+        photos.create_upload(1, JPEG, None)
+    assert e.value.status_code == 503
+
+
+def test_sweep_removes_only_stale_idle_uploads():
+    stale, fresh, busy = (photos.create_upload(4, JPEG, None) for _ in range(3))
+    old = 1_000_000_000
+    for token in (stale, busy):
+        for path in (photos._meta_path(token), photos._part_path(token)):
+            os.utime(path, (old, old))
+
+    writer = photos.ChunkWriter(busy, 0)  # PATCH פעיל מחזיק flock
+    try:
+        assert photos.sweep_stale_uploads(force=True) == 1
+    finally:
+        writer.close()
+
+    with pytest.raises(photos.UploadError):
+        photos.get_upload(stale)
+    assert photos.get_upload(fresh)["offset"] == 0
+    assert photos.get_upload(busy)["offset"] == 0
+
+
+def test_pending_jobs_skips_markers_released_mid_scan(monkeypatch):
+    for token in ("a" * 32, "b" * 32):
+        open(photos._queued_path(token), "w").close()
+
+    real_scandir = os.scandir
+
+    def scandir_then_release(path):
+        entries = list(real_scandir(path))
+        # worker אחר סיים עיבוד בין scandir ל-stat
+        os.remove(entries[0].path)
+        return iter(entries)
+
+    monkeypatch.setattr(photos.os, "scandir", scandir_then_release)
+    assert photos.pending_jobs() == 1
+    assert photos.sweep_stale_uploads(force=True) == 0
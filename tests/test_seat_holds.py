@@ -0,0 +1,154 @@
+# tests/test_seat_holds.py
+#
+# ההחזקות והשיבוץ הם UPDATE מותנה (compare-and-set) במקום FOR UPDATE –
+# הבדיקות מוודאות שכל מסלול של התנגשות נדחה ושלא נשאר שינוי חלקי.
+
+import pytest
+import sqlalchemy as sa
+
+
+@pytest.fixture
+def crud(engine):
+    from backend import crud
+    return crud
+
+
+@pytest.fixture
+def hall(db, crud):
+    """שולחן של 4 כיסאות ושני אורחים. מחזיר (seat_ids, guest_a, guest_b)."""
+    from backend.db import Seat
+
+    crud.create_new_table(db, "Hall", 4)
+    seat_ids = [s.id for s in db.query(Seat).order_by(Seat.row)]
+    a = crud.create_user(db, {"name": "a", "phone": "0500000001"})
+    b = crud.create_user(db, {"name": "b", "phone": "0500000002"})
+    return seat_ids, a.id, b.id
+
+
+def _expire(db, hold_id: str) -> None:
+    db.execute(
+        sa.text("UPDATE seats SET hold_expires_at = now() - interval '1 second' WHERE held_by = :h"),
+        {"h": hold_id},
+    )
+    db.commit()
+
+
+def _seats(db, *ids):
+    from backend.db import Seat
+
+    db.expire_all()
+    return {s.id: s for s in db.query(Seat).filter(Seat.id.in_(ids))}
+
+
+def test_active_hold_of_another_admin_conflicts(db, crud, hall):
+    seat_ids, a, b = hall
+    hold = crud.place_hold(db, seat_ids[:2], a)
+
+    with pytest.raises(ValueError):
+        crud.place_hold(db, seat_ids[1:3], b)
+
+    seats = _seats(db, *seat_ids[:3])
+    assert [seats[i].held_by for i in seat_ids[:3]] == [hold, hold, None]
+
+
+def test_expired_hold_can_be_taken_over(db, crud, hall):
+    seat_ids, a, b = hall
+    old = crud.place_hold(db, seat_ids[:2], a)
+    _expire(db, old)
+
+    new = crud.place_hold(db, seat_ids[:2], b)
+
+    assert {s.held_by for s in _seats(db, *seat_ids[:2]).values()} == {new}
+    # מי שההחזקה שלו פגה כבר לא יכול לשבץ איתה
+    with pytest.raises(ValueError):
+        crud.assign_seats(db, seat_ids[:2], a, old)
+
+
+def test_renewal_with_same_hold_id_extends_it(db, crud, hall):
+    seat_ids, a, _ = hall
+    hold = crud.place_hold(db, seat_ids[:2], a)
+    db.execute(
+        sa.text("UPDATE seats SET hold_expires_at = now() + interval '5 seconds' WHERE held_by = :h"),
+        {"h": hold},
+    )
+    db.commit()
+
+    assert crud.place_hold(db, seat_ids[:2], a, hold) == hold
+
+    remaining = db.execute(
+        sa.text("SELECT min(hold_expires_at - now()) FROM seats WHERE held_by = :h"), {"h": hold}
+    ).scalar()
+    assert remaining.total_seconds() > crud.HOLD_TTL.total_seconds() - 5
+
+
+def test_moving_a_hold_releases_the_previous_seats(db, crud, hall):
+    seat_ids, a, _ = hall
+    hold = crud.place_hold(db, seat_ids[:2], a)
+
+    crud.place_hold(db, seat_ids[2:], a, hold)
+
+    seats = _seats(db, *seat_ids)
+    assert [seats[i].held_by for i in seat_ids] == [None, None, hold, hold]
+
+
+def test_assign_with_hold_claims_and_clears_it(db, crud, hall):
+    seat_ids, a, _ = hall
+    hold = crud.place_hold(db, seat_ids[:3], a)
+
+    crud.assign_seats(db, seat_ids[:2], a, hold)
+
+    seats = _seats(db, *seat_ids[:3])
+    assert [seats[i].owner_id for i in seat_ids[:3]] == [a, a, None]
+    # גם השארית של ההחזקה (הכיסא השלישי) משתחררת
+    assert {s.held_by for s in seats.values()} == {None}
+
+
+@pytest.mark.parametrize("which", ["foreign", "stale"])
+def test_assign_with_bad_hold_is_rejected_and_rolled_back(db, crud, hall, which):
+    seat_ids, a, b = hall
+    crud.assign_seats(db, [seat_ids[3]], a)          # a כבר יושב בכיסא 4
+    crud.place_hold(db, seat_ids[:2], b)             # אדמין אחר מחזיק את 1-2
+    hold = crud.place_hold(db, seat_ids[2:3], a)     # ההחזקה שלנו – על כיסא 3 בלבד
+    if which == "stale":
+        _expire(db, hold)
+        target = seat_ids[2:3]
+    else:
+        target = seat_ids[:2]                        # כיסאות שההחזקה שלנו לא מכסה
+
+    with pytest.raises(ValueError):
+        crud.assign_seats(db, target, a, hold)
+
+    # השחרור של הכיסא הקודם (שלב 1 ב-assign_seats) התבטל יחד עם השאר
+    seats = _seats(db, *seat_ids)
+    assert seats[seat_ids[3]].owner_id == a
+    assert all(seats[i].owner_id is None for i in seat_ids[:3])
+
+
+def test_assign_without_hold_skips_seats_held_by_others(db, crud, hall):
+    seat_ids, a, b = hall
+    crud.place_hold(db, seat_ids[:1], b)
+
+    with pytest.raises(ValueError):
+        crud.assign_seats(db, seat_ids[:2], a)
+    assert all(s.owner_id is None for s in _seats(db, *seat_ids[:2]).values())
+
+
+def test_empty_hold_is_rejected(db, crud, hall):
+    seat_ids, a, _ = hall
+    hold = crud.place_hold(db, seat_ids[:2], a)
+
+    with pytest.raises(ValueError):
+        crud.place_hold(db, [], a, hold)
+    assert {s.held_by for s in _seats(db, *seat_ids[:2]).values()} == {hold}
+
+
+def test_sweep_clears_only_expired_holds(db, crud, hall):
+    seat_ids, a, b = hall
+    live = crud.place_hold(db, seat_ids[:2], a)
+    dead = crud.place_hold(db, seat_ids[2:], b)
+    _expire(db, dead)
+
+    assert crud.sweep_expired_holds(db, force=True) == 2
+
+    seats = _seats(db, *seat_ids)
+    assert [seats[i].held_by for i in seat_ids] == [live, live, None, None]